@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""HyDE hypothetical-answer cache for Paths A and D.
+
+Generating the ~200-word fake answer is the slowest step of ``hyde_search()``.
+``HydeGenerator`` memoizes the passage *and* its embedding, keyed by the
+normalized query text (lower-cased, whitespace collapsed), with:
+
+  • LRU eviction once ``max_entries`` is reached;
+  • a TTL so stale passages are regenerated eventually.
+
+``generate_many()`` is the batch API: uncached queries are sent to the LLM
+concurrently and all new passages are embedded in ONE embedding call.
+
+Usage (from the other answer scripts in this folder):
+    from hyde_cache import HydeGenerator
+
+    hyde = HydeGenerator(chat_client, CHAT_MODEL, embed_fn=_embed)
+    passage, vec, cached = hyde.generate("How does attention work?")
+    results = hyde.generate_many(["q1", "q2", "q3"])   # [(passage, vec, cached), …]
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+
+HYDE_PROMPT = "Write a short passage (~200 words) that answers: {query}"
+
+
+def normalize_query(query: str) -> str:
+    """Cache key for a query: lower-case with whitespace collapsed."""
+    return " ".join(query.lower().split())
+
+
+class HydeGenerator:
+    """Generate (and memoize) HyDE passages and their embeddings."""
+
+    def __init__(
+        self,
+        chat_client,
+        chat_model: str,
+        embed_fn: Callable[[list[str]], list[list[float]]],
+        *,
+        max_entries: int = 256,
+        ttl_seconds: float = 24 * 3600,
+        max_workers: int = 8,
+    ) -> None:
+        self.chat_client = chat_client
+        self.chat_model = chat_model
+        self.embed_fn = embed_fn
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_workers = max_workers
+        # key → (created_at, passage, embedding)
+        self._entries: OrderedDict[str, tuple[float, str, list[float]]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def generate(self, query: str) -> tuple[str, list[float], bool]:
+        """Return (passage, embedding, was_cached) for one query."""
+        return self.generate_many([query])[0]
+
+    def generate_many(self, queries: list[str]) -> list[tuple[str, list[float], bool]]:
+        """Batch HyDE: concurrent generation for misses, one embed call."""
+        keys = [normalize_query(q) for q in queries]
+        hits = {k: self._get(k) for k in dict.fromkeys(keys)}
+        todo = {k: q for k, q in zip(keys, queries) if hits[k] is None}
+
+        if todo:
+            workers = max(1, min(self.max_workers, len(todo)))
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                passages = list(pool.map(self._write_passage, todo.values()))
+            vecs = self.embed_fn(passages)
+            for k, passage, vec in zip(todo, passages, vecs):
+                self._put(k, passage, vec)
+                hits[k] = (passage, vec)
+
+        return [(*hits[k], k not in todo) for k in keys]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    # ── internals ──────────────────────────────────────────────────────────
+
+    def _write_passage(self, query: str) -> str:
+        resp = self.chat_client.chat.completions.create(
+            model=self.chat_model,
+            messages=[{"role": "user", "content": HYDE_PROMPT.format(query=query)}],
+        )
+        return resp.choices[0].message.content
+
+    def _get(self, key: str) -> tuple[str, list[float]] | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            created_at, passage, vec = entry
+            if time.monotonic() - created_at > self.ttl_seconds:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return passage, vec
+
+    def _put(self, key: str, passage: str, vec: list[float]) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic(), passage, vec)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
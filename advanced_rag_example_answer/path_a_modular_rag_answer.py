@@ -15,6 +15,7 @@ import argparse
 import sys
 import time
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 # NOTE: This imports from the example answer key. To use YOUR OWN Part 3 code
@@ -26,14 +27,16 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "docling-exercise-example-answers"))
 
 from docling_part3_answer import (  # ← change to docling_part3_exercise to use YOUR code (see NOTE above)
-    _connect_db, _search_vector, _search_bm25,
+    _connect_db, _search_vector, _search_bm25, _fetch_texts, _embed,
     _hybrid_search, _generate_answer,
     _add_embeddings, _create_indexes,
-    EMBED_MODEL, RRF_K,
+    RRF_K,
 )
-import ollama
 from openai import OpenAI
-import requests
+
+from query_classifier import QueryClassifier, classify_lexical
+from hyde_cache import HydeGenerator
+from rerank_client import RerankClient
 
 # ── Remote GPU Models ────────────────────────────────────────────────────────
 chat_client = OpenAI(
@@ -45,14 +48,13 @@ CHAT_MODEL = "qwen3-vl-8b"
 RERANK_URL = "https://dev-8--qwen3-vl-reranker-2b-serve.modal.run/v1/rerank"
 RERANK_MODEL = "qwen3-vl-reranker-2b"
 
-def _rerank(query: str, documents: list[str], top_k: int = 3) -> list[tuple[str, float]]:
-    """Rerank documents using remote GPU reranker. Returns [(text, score), ...]."""
-    resp = requests.post(RERANK_URL, json={
-        "model": RERANK_MODEL, "query": query,
-        "documents": documents, "top_n": top_k,
-    })
-    results = resp.json()["results"]
-    return [(r["document"], r["relevance_score"]) for r in results]
+# Shared pooled client (keep-alive, timeout, retries, batching) – see
+# rerank_client.py.  _rerank(query, documents, top_k) → [(text, score), ...]
+reranker = RerankClient(RERANK_URL, RERANK_MODEL)
+_rerank = reranker.rerank
+
+# HyDE passages and their embeddings, cached with TTL + LRU (see hyde_cache.py).
+hyde = HydeGenerator(chat_client, CHAT_MODEL, embed_fn=_embed)
 
 DEFAULT_DB = Path(__file__).resolve().parent.parent / "docling-exercise-example-answers" / "output" / "rag_chunks.duckdb"
 
@@ -65,30 +67,23 @@ def hyde_search(conn, query: str, top_k: int = 5) -> list[dict]:
     """Search using HyDE: generate fake answer → embed it → vector search."""
     print(f"\n🔮 [HyDE] Generating hypothetical answer for: '{query}'")
 
-    resp = chat_client.chat.completions.create(
-        model=CHAT_MODEL,
-        messages=[{"role": "user",
-                   "content": f"Write a short passage (~200 words) that answers: {query}"}],
-    )
-    fake_answer = resp.choices[0].message.content
-    print(f"   📝 Fake answer:")
+    # Passage + its embedding are memoized per normalized query (see hyde_cache.py)
+    fake_answer, hyde_vec, cached = hyde.generate(query)
+    print(f"   📝 Fake answer{' (cached)' if cached else ''}:")
     print(f"   ┌{'─'*70}")
     for line in fake_answer.splitlines():
         print(f"   │ {line}")
     print(f"   └{'─'*70}")
 
-    hyde_vec = ollama.embed(model=EMBED_MODEL, input=fake_answer)["embeddings"][0]
     print(f"   📐 Embedded fake answer → {len(hyde_vec)}-dim vector")
 
     vec_results = _search_vector(conn, hyde_vec, limit=top_k)
 
-    results = []
-    for chunk_id, score in vec_results:
-        row = conn.execute(
-            "SELECT chunk_id, text FROM rag_chunks WHERE chunk_id = ?",
-            [chunk_id],
-        ).fetchone()
-        results.append({"chunk_id": row[0], "text": row[1], "score": score})
+    texts = _fetch_texts(conn, [chunk_id for chunk_id, _score in vec_results])
+    results = [
+        {"chunk_id": chunk_id, "text": texts[chunk_id], "score": score}
+        for chunk_id, score in vec_results
+    ]
 
     print(f"\n   ✅ Found {len(results)} chunks via HyDE:")
     for i, c in enumerate(results):
@@ -97,7 +92,6 @@ def hyde_search(conn, query: str, top_k: int = 5) -> list[dict]:
     return results
 
 
-
 # ═══════════════════════════════════════════════════════════════════════════
 # TODO 2 ✅: multi_query_search()
 # ═══════════════════════════════════════════════════════════════════════════
@@ -123,11 +117,28 @@ def multi_query_search(conn, query: str, top_k: int = 5) -> list[dict]:
         tag = "original" if i == 0 else f"variant {i}"
         print(f"      [{tag}] {q}")
 
+    # Embed every query in ONE batched call; the shared embedding cache then
+    # serves each _hybrid_search below without another round-trip.
+    _embed(all_queries)
+
+    # Run the per-query searches on a thread pool.  A DuckDB connection must
+    # not be shared across threads, so each search gets its own cursor.
+    cursors = [conn.cursor() for _ in all_queries]
+    try:
+        with ThreadPoolExecutor(max_workers=len(all_queries)) as pool:
+            per_query = list(pool.map(
+                lambda cur, q: _hybrid_search(cur, q, top_k=top_k),
+                cursors, all_queries,
+            ))
+    finally:
+        for cur in cursors:
+            cur.close()
+
+    # RRF merge once, in query order, after every search has finished.
     fused_scores: dict[int, float] = defaultdict(float)
     chunk_texts: dict[int, str] = {}
 
-    for q in all_queries:
-        results = _hybrid_search(conn, q, top_k=top_k)
+    for results in per_query:
         for rank, chunk in enumerate(results):
             cid = chunk["chunk_id"]
             fused_scores[cid] += 1.0 / (RRF_K + rank + 1)
@@ -180,27 +191,120 @@ def classify_query(query: str) -> str:
     return category
 
 
+def classify_query_heuristic(query: str) -> str:
+    """Local, instant stand-in for classify_query() – rules only, no LLM call.
+
+    See query_classifier.classify_lexical() for the rules.
+    """
+    category = classify_lexical(query)
+    print(f"\n🏷️  [Classify/heuristic] '{query}' → {category}")
+    return category
+
+
+_local_classifier: QueryClassifier | None = None
+
+
+def classify_query_local(query: str, query_vec: list[float] | None = None) -> str:
+    """Nearest-centroid + lexical classifier; asks the LLM only when unsure."""
+    global _local_classifier
+    if _local_classifier is None:
+        # Seed centroids are embedded once (and cached) on first use.
+        _local_classifier = QueryClassifier(embed_fn=_embed, fallback=classify_query)
+    category, margin, source = _local_classifier.classify(query, query_vec)
+    print(f"\n🏷️  [Classify/{source}] '{query}' → {category} (margin={margin:.3f})")
+    return category
+
+
 # ═══════════════════════════════════════════════════════════════════════════
 # TODO 4 ✅: modular_rag()
 # ═══════════════════════════════════════════════════════════════════════════
 
-def modular_rag(conn, query: str, top_k: int = 5) -> list[dict]:
-    """Route query to the best search strategy based on classification."""
+def _bm25_chunks(conn, query: str, top_k: int) -> list[dict]:
+    """BM25 search with texts attached: [{chunk_id, text, score}, …]."""
+    results = _search_bm25(conn, query, limit=top_k)
+    texts = _fetch_texts(conn, [chunk_id for chunk_id, _score in results])
+    return [
+        {"chunk_id": chunk_id, "text": texts[chunk_id], "score": score}
+        for chunk_id, score in results
+    ]
+
+
+def _bm25_chunks_own_cursor(conn, query: str, top_k: int) -> list[dict]:
+    """_bm25_chunks() on a cursor of its own, for use from a worker thread."""
+    cursor = conn.cursor()
+    try:
+        return _bm25_chunks(cursor, query, top_k)
+    finally:
+        cursor.close()
+
+
+def _speculative_result(future):
+    """Result of a speculative task, or None if it failed.
+
+    The caller then takes the normal (non-speculative) path for that step.
+    """
+    try:
+        return future.result()
+    except Exception as exc:
+        print(f"   ⚠️  Speculative step failed ({exc}) – falling back")
+        return None
+
+
+def modular_rag(conn, query: str, top_k: int = 5, speculative: bool = True,
+                classifier: str = "local") -> list[dict]:
+    """Route query to the best search strategy based on classification.
+
+    speculative: start the cheap local work (BM25 search, query embedding)
+        while the classifier is still running, then keep only the branch the
+        router picks.  BM25 is the whole factual branch; the query embedding
+        lands in the shared cache for the multi-query branch.
+    classifier: "local" (centroid + lexical, LLM only when unsure), "llm"
+        (remote classify_query) or "heuristic" (rules only).
+    """
     t0 = time.time()
-    category = classify_query(query)
+
+    def classify(query_vec: list[float] | None = None) -> str:
+        if classifier == "local":
+            try:
+                return classify_query_local(query, query_vec)
+            except Exception as exc:  # e.g. embedding service down
+                print(f"   ⚠️  Local classifier failed ({exc}) – asking the LLM")
+                return classify_query(query)
+        if classifier == "heuristic":
+            return classify_query_heuristic(query)
+        return classify_query(query)
+
+    bm25_chunks = None
+    if speculative:
+        # Not a `with` block: its shutdown(wait=True) would make a non-factual
+        # route wait for the speculative BM25 search it doesn't use.
+        pool = ThreadPoolExecutor(max_workers=2)
+        try:
+            # DuckDB connections are not shared across threads, so the BM25
+            # task opens (and closes) its own cursor.
+            bm25_future = pool.submit(_bm25_chunks_own_cursor, conn, query, top_k)
+            embed_future = pool.submit(_embed, [query])
+            if classifier == "local":
+                # The local classifier reuses the query embedding.
+                query_vecs = _speculative_result(embed_future)
+                category = classify(query_vecs[0] if query_vecs else None)
+            else:
+                category = classify()
+            if category == "factual":
+                # None on failure → BM25 runs again below, unspeculated
+                bm25_chunks = _speculative_result(bm25_future)
+        finally:
+            # Route now; speculative work still in flight finishes in the
+            # background and its result is ignored.
+            pool.shutdown(wait=False, cancel_futures=True)
+    else:
+        category = classify()
 
     print(f"\n🔀 [Router] Routing '{category}' query to best strategy...")
 
     if category == "factual":
         print(f"   → Using BM25 (keyword search for factual queries)")
-        results = _search_bm25(conn, query, limit=top_k)
-        chunks = []
-        for chunk_id, score in results:
-            row = conn.execute(
-                "SELECT chunk_id, text FROM rag_chunks WHERE chunk_id = ?",
-                [chunk_id],
-            ).fetchone()
-            chunks.append({"chunk_id": row[0], "text": row[1], "score": score})
+        chunks = bm25_chunks if bm25_chunks is not None else _bm25_chunks(conn, query, top_k)
         print(f"\n   ✅ Found {len(chunks)} chunks via BM25:")
         for i, c in enumerate(chunks):
             print(f"\n   ── Rank {i+1} | chunk_id={c['chunk_id']} | score={c['score']:.4f} ──")
@@ -227,6 +331,9 @@ def main() -> int:
     )
     parser.add_argument("--db", type=Path, default=DEFAULT_DB)
     parser.add_argument("--query", type=str, required=True)
+    parser.add_argument("--classifier", choices=["local", "llm", "heuristic"],
+                        default="local")
+    parser.add_argument("--no-speculative", action="store_true", default=False)
     args = parser.parse_args()
 
     try:
@@ -234,7 +341,9 @@ def main() -> int:
         _add_embeddings(conn)
         _create_indexes(conn)
 
-        chunks = modular_rag(conn, args.query)
+        chunks = modular_rag(conn, args.query,
+                             speculative=not args.no_speculative,
+                             classifier=args.classifier)
 
         print(f"\n{'='*60}")
         print(f"💬 Generating final answer...")
@@ -14,6 +14,7 @@ from __future__ import annotations
 import argparse
 import sys
 import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 # NOTE: This imports from the example answer key. To use YOUR OWN Part 3 code
@@ -29,7 +30,8 @@ from docling_part3_answer import (  # ← change to docling_part3_exercise to us
     _add_embeddings, _create_indexes,
 )
 from openai import OpenAI
-import requests
+
+from rerank_client import RerankClient
 
 # ── Remote GPU Models ────────────────────────────────────────────────────────
 chat_client = OpenAI(
@@ -41,14 +43,10 @@ CHAT_MODEL = "qwen3-vl-8b"
 RERANK_URL = "https://dev-8--qwen3-vl-reranker-2b-serve.modal.run/v1/rerank"
 RERANK_MODEL = "qwen3-vl-reranker-2b"
 
-def _rerank(query: str, documents: list[str], top_k: int = 3) -> list[tuple[str, float]]:
-    """Rerank documents using remote GPU reranker. Returns [(text, score), ...]."""
-    resp = requests.post(RERANK_URL, json={
-        "model": RERANK_MODEL, "query": query,
-        "documents": documents, "top_n": top_k,
-    })
-    results = resp.json()["results"]
-    return [(r["document"], r["relevance_score"]) for r in results]
+# Shared pooled client (keep-alive, timeout, retries, batching) – see
+# rerank_client.py.  _rerank(query, documents, top_k) → [(text, score), ...]
+reranker = RerankClient(RERANK_URL, RERANK_MODEL)
+_rerank = reranker.rerank
 
 DEFAULT_DB = Path(__file__).resolve().parent.parent / "docling-exercise-example-answers" / "output" / "rag_chunks.duckdb"
 MAX_RETRIES = 2
@@ -79,23 +77,45 @@ def rewrite_query(original_query: str) -> str:
 # ═══════════════════════════════════════════════════════════════════════════
 
 def grade_documents(query: str, chunks: list[dict],
-                    threshold: float = 0.3) -> tuple[list[dict], float]:
-    """Grade documents using reranker scores. Returns (good_chunks, avg_score)."""
-    texts = [c["text"] for c in chunks]
-
-    # Rerank ALL documents to get scores
-    scored = _rerank(query, texts, top_k=len(texts))
+                    threshold: float = 0.3,
+                    memo: dict[tuple[str, int], float] | None = None,
+                    ) -> tuple[list[dict], float]:
+    """Grade documents using reranker scores. Returns (good_chunks, avg_score).
+
+    `memo` maps (query, chunk_id) → rerank score.  Only chunks without a
+    memoized score are sent to the reranker; new scores are added to it.
+    """
+    memo = {} if memo is None else memo
+
+    # Rerank only the chunks we have not scored for this query yet
+    unscored = [c for c in chunks if (query, c["chunk_id"]) not in memo]
+    if unscored:
+        texts = [c["text"] for c in unscored]
+        text_to_ids: dict[str, list[int]] = {}
+        for c in unscored:
+            text_to_ids.setdefault(c["text"], []).append(c["chunk_id"])
+        for t, s in _rerank(query, texts, top_k=len(texts)):
+            for chunk_id in text_to_ids.get(t, []):
+                memo[(query, chunk_id)] = s
+    print(f"   🧮 Reranked {len(unscored)} new chunk(s), "
+          f"{len(chunks) - len(unscored)} from memo")
+
+    scored = sorted(
+        ({"chunk_id": c["chunk_id"], "text": c["text"],
+          "score": memo.get((query, c["chunk_id"]), 0.0)} for c in chunks),
+        key=lambda c: c["score"], reverse=True,
+    )
 
     # Filter by threshold
-    good = [{"text": t, "score": s} for t, s in scored if s >= threshold]
-    all_scores = [s for _, s in scored]
+    good = [c for c in scored if c["score"] >= threshold]
+    all_scores = [c["score"] for c in scored]
     avg_score = sum(all_scores) / len(all_scores) if all_scores else 0.0
 
     print(f"   📊 Grading results:")
-    for i, (t, s) in enumerate(scored):
-        status = "✅" if s >= threshold else "❌"
-        print(f"\n   ── Rank {i+1} | rerank_score={s:.4f} {status} ──")
-        print(f"   {t}")
+    for i, c in enumerate(scored):
+        status = "✅" if c["score"] >= threshold else "❌"
+        print(f"\n   ── Rank {i+1} | rerank_score={c['score']:.4f} {status} ──")
+        print(f"   {c['text']}")
     print(f"\n   📊 Avg score: {avg_score:.3f} | Threshold: {threshold}")
     print(f"   📊 Kept {len(good)}/{len(chunks)} documents above threshold")
 
@@ -108,41 +128,68 @@ def grade_documents(query: str, chunks: list[dict],
 
 def corrective_rag(conn, query: str, threshold: float = 0.3,
                    top_k: int = 5) -> list[dict]:
-    """CRAG loop: retrieve → grade → rewrite if needed → retry."""
+    """CRAG loop: retrieve → grade → rewrite if needed → retry.
+
+    Chunks are always graded against the ORIGINAL query, so a rerank score
+    memoized on one attempt is reused on the next.  The rewrite for the next
+    attempt is started speculatively while grading runs, and the loop stops
+    early once the kept set stops changing between attempts.
+    """
     current_query = query
     t0 = time.time()
+    memo: dict[tuple[str, int], float] = {}
+    previous_kept: set[int] | None = None
 
-    for attempt in range(MAX_RETRIES + 1):
-        print(f"\n{'='*60}")
-        print(f"🔍 Attempt {attempt + 1}/{MAX_RETRIES + 1}: '{current_query}'")
-        print(f"{'='*60}")
-
-        # Step A: Retrieve
-        chunks = _hybrid_search(conn, current_query, top_k=top_k)
-        print(f"   📦 Retrieved {len(chunks)} chunks")
-
-        # Step B: Grade
-        good, avg = grade_documents(current_query, chunks, threshold)
-
-        # Step C: Decide
-        if avg >= threshold:
-            elapsed = time.time() - t0
-            print(f"\n   ✅ Quality sufficient! (avg={avg:.3f} >= {threshold})")
-            print(f"   ⏱️  Total time: {elapsed:.1f}s across {attempt + 1} attempt(s)")
-            return good if good else chunks
-
-        if attempt < MAX_RETRIES:
-            # Rewrite and retry
-            new_q = rewrite_query(current_query)
-            print(f"\n   🔄 Rewriting query:")
-            print(f"      Before: '{current_query}'")
-            print(f"      After:  '{new_q}'")
-            current_query = new_q
-        else:
-            elapsed = time.time() - t0
-            print(f"\n   ⚠️  Max retries reached. Using best available results.")
-            print(f"   ⏱️  Total time: {elapsed:.1f}s across {attempt + 1} attempt(s)")
-            return good if good else chunks
+    # Not a `with` block: its shutdown(wait=True) would make an early return
+    # wait for the discarded speculative rewrite to finish.
+    pool = ThreadPoolExecutor(max_workers=1)
+    try:
+        for attempt in range(MAX_RETRIES + 1):
+            print(f"\n{'='*60}")
+            print(f"🔍 Attempt {attempt + 1}/{MAX_RETRIES + 1}: '{current_query}'")
+            print(f"{'='*60}")
+
+            # Step A: Retrieve
+            chunks = _hybrid_search(conn, current_query, top_k=top_k)
+            print(f"   📦 Retrieved {len(chunks)} chunks")
+
+            # Speculative rewrite: overlap the LLM call with grading
+            rewrite = (pool.submit(rewrite_query, current_query)
+                       if attempt < MAX_RETRIES else None)
+
+            # Step B: Grade (only chunks not scored in earlier attempts)
+            good, avg = grade_documents(query, chunks, threshold, memo)
+            kept = {c["chunk_id"] for c in good}
+
+            # Step C: Decide
+            if avg >= threshold:
+                elapsed = time.time() - t0
+                print(f"\n   ✅ Quality sufficient! (avg={avg:.3f} >= {threshold})")
+                print(f"   ⏱️  Total time: {elapsed:.1f}s across {attempt + 1} attempt(s)")
+                return good if good else chunks
+
+            if previous_kept is not None and kept == previous_kept:
+                elapsed = time.time() - t0
+                print(f"\n   ⏹️  Kept set unchanged since last attempt – stopping early.")
+                print(f"   ⏱️  Total time: {elapsed:.1f}s across {attempt + 1} attempt(s)")
+                return good if good else chunks
+            previous_kept = kept
+
+            if rewrite is not None:
+                # Rewrite and retry
+                new_q = rewrite.result()
+                print(f"\n   🔄 Rewriting query:")
+                print(f"      Before: '{current_query}'")
+                print(f"      After:  '{new_q}'")
+                current_query = new_q
+            else:
+                elapsed = time.time() - t0
+                print(f"\n   ⚠️  Max retries reached. Using best available results.")
+                print(f"   ⏱️  Total time: {elapsed:.1f}s across {attempt + 1} attempt(s)")
+                return good if good else chunks
+    finally:
+        # Return now; a rewrite still in flight finishes in the background
+        pool.shutdown(wait=False, cancel_futures=True)
 
     return chunks  # fallback
 
@@ -40,14 +40,52 @@ CHAT_MODEL = "qwen3-vl-8b"
 DEFAULT_DB = Path(__file__).resolve().parent.parent / "docling-exercise-example-answers" / "output" / "rag_chunks.duckdb"
 MAX_ROUNDS = 3
 
+# Upper bound on the (estimated) tokens of retrieved context sent per draft.
+CONTEXT_TOKEN_BUDGET = 3000
+
+
+def _estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token for English text)."""
+    return max(1, len(text) // 4)
+
+
+def _add_new_chunks(context: list[dict], seen: set[int], candidates: list[dict],
+                    budget: int, limit: int) -> list[dict]:
+    """Append up to `limit` unseen candidates to `context` within `budget` tokens.
+
+    Returns the chunks that were added.  `seen` is updated with every
+    candidate considered, so a chunk that did not fit is not retried.
+    """
+    used = sum(_estimate_tokens(c["text"]) for c in context)
+    added = []
+    for c in candidates:
+        if len(added) >= limit:
+            break
+        if c["chunk_id"] in seen:
+            continue
+        seen.add(c["chunk_id"])
+        cost = _estimate_tokens(c["text"])
+        if used + cost > budget:
+            continue
+        context.append(c)
+        added.append(c)
+        used += cost
+    return added
+
 
 # ═══════════════════════════════════════════════════════════════════════════
 # TODO 1 ✅: generate_draft()
 # ═══════════════════════════════════════════════════════════════════════════
 
 def generate_draft(query: str, chunks: list[dict],
-                   previous_answer: str = "") -> str:
-    """Generate an answer draft from context. Optionally improve a previous answer."""
+                   previous_answer: str = "", stream: bool = False,
+                   stats: dict | None = None) -> str:
+    """Generate an answer draft from context. Optionally improve a previous answer.
+
+    With ``stream=True`` tokens are printed as they arrive, followed by
+    time-to-first-token and tokens/sec.  If `stats` is given it receives
+    ``prompt_tokens`` (server-reported, else estimated).
+    """
     context = "\n\n---\n\n".join(c["text"] for c in chunks)
 
     if not previous_answer:
@@ -64,11 +102,51 @@ def generate_draft(query: str, chunks: list[dict],
             f"Provide an improved, more complete answer:"
         )
 
-    resp = chat_client.chat.completions.create(
+    if not stream:
+        resp = chat_client.chat.completions.create(
+            model=CHAT_MODEL,
+            messages=[{"role": "user", "content": prompt}],
+        )
+        if stats is not None:
+            stats["prompt_tokens"] = (resp.usage.prompt_tokens if resp.usage
+                                      else _estimate_tokens(prompt))
+        return resp.choices[0].message.content
+
+    # Stream tokens to the terminal as they arrive and time the first one –
+    # that, not total generation time, is what the user waits on.
+    t0 = time.perf_counter()
+    ttft = None
+    tokens = 0
+    prompt_tokens = _estimate_tokens(prompt)
+    parts = []
+    print(f"   📝 Draft (streaming):\n")
+    for chunk in chat_client.chat.completions.create(
         model=CHAT_MODEL,
         messages=[{"role": "user", "content": prompt}],
-    )
-    return resp.choices[0].message.content
+        stream=True,
+        stream_options={"include_usage": True},
+    ):
+        if chunk.usage is not None:
+            tokens = chunk.usage.completion_tokens
+            prompt_tokens = chunk.usage.prompt_tokens
+        if not chunk.choices:
+            continue
+        token = chunk.choices[0].delta.content
+        if token:
+            if ttft is None:
+                ttft = time.perf_counter() - t0
+            parts.append(token)
+            print(token, end="", flush=True)
+
+    elapsed = time.perf_counter() - t0
+    ttft = ttft if ttft is not None else elapsed
+    tokens = tokens or len(parts)
+    gen_secs = elapsed - ttft
+    rate = tokens / gen_secs if gen_secs > 0 else 0.0
+    print(f"\n\n   ⏱️  TTFT {ttft:.2f}s | {tokens} tokens @ {rate:.1f} tok/s")
+    if stats is not None:
+        stats["prompt_tokens"] = prompt_tokens
+    return "".join(parts)
 
 
 # ═══════════════════════════════════════════════════════════════════════════
@@ -102,34 +180,49 @@ def reflect_on_answer(query: str, answer: str) -> tuple[bool, str]:
 # ═══════════════════════════════════════════════════════════════════════════
 
 def self_rag(conn, query: str, max_rounds: int = 3,
-             top_k: int = 5) -> str:
-    """Self-RAG loop: generate → reflect → improve until sufficient."""
+             top_k: int = 5, stream: bool = True,
+             token_budget: int = CONTEXT_TOKEN_BUDGET) -> str:
+    """Self-RAG loop: generate → reflect → improve until sufficient.
+
+    Context is deduplicated by chunk_id and capped at `token_budget`
+    (estimated) tokens.  Later rounds search with the critique appended to
+    the query and only add chunks not seen before.
+    """
+    if max_rounds < 1:
+        raise ValueError(f"max_rounds must be at least 1, got {max_rounds}")
     t0 = time.time()
     print(f"\n🧠 [Self-RAG] Starting with query: '{query}'")
 
     # Step A: Initial retrieval
     chunks = _hybrid_search(conn, query, top_k=top_k)
-    all_chunks = list(chunks)
-    print(f"   📦 Initial retrieval: {len(chunks)} chunks:")
-    for i, c in enumerate(chunks):
+    all_chunks: list[dict] = []
+    seen: set[int] = set()
+    _add_new_chunks(all_chunks, seen, chunks, token_budget, limit=top_k)
+    print(f"   📦 Initial retrieval: {len(all_chunks)} chunks:")
+    for i, c in enumerate(all_chunks):
         print(f"\n   ── Chunk {i+1} | chunk_id={c['chunk_id']} ──")
         print(f"   {c['text']}")
 
     previous_answer = ""
+    report: list[dict] = []
 
     # Step B: Loop
     for round_num in range(1, max_rounds + 1):
+        round_t0 = time.time()
         print(f"\n{'='*60}")
         print(f"📝 Round {round_num}/{max_rounds}")
         print(f"{'='*60}")
 
         # Generate
-        answer = generate_draft(query, all_chunks, previous_answer)
-        print(f"   📝 Draft ({len(answer)} chars):")
-        print(f"   ┌{'─'*70}")
-        for line in answer.splitlines():
-            print(f"   │ {line}")
-        print(f"   └{'─'*70}")
+        draft_stats: dict = {}
+        answer = generate_draft(query, all_chunks, previous_answer,
+                                stream=stream, stats=draft_stats)
+        if not stream:
+            print(f"   📝 Draft ({len(answer)} chars):")
+            print(f"   ┌{'─'*70}")
+            for line in answer.splitlines():
+                print(f"   │ {line}")
+            print(f"   └{'─'*70}")
 
         # Reflect
         sufficient, critique = reflect_on_answer(query, answer)
@@ -140,23 +233,45 @@ def self_rag(conn, query: str, max_rounds: int = 3,
             print(f"   │ {line}")
         print(f"   └{'─'*70}")
 
-        if sufficient:
-            elapsed = time.time() - t0
-            print(f"\n   🎉 Answer deemed sufficient after {round_num} round(s)!")
-            print(f"   ⏱️  Total time: {elapsed:.1f}s")
-            return answer
-
-        if round_num < max_rounds:
-            # Retrieve more context for next round
+        added: list[dict] = []
+        if not sufficient and round_num < max_rounds:
+            # Retrieve NEW context: steer the search with the critique and
+            # over-fetch so that enough unseen chunks remain after filtering.
             print(f"   🔄 Retrieving additional context for improvement...")
-            new_chunks = _hybrid_search(conn, query, top_k=top_k)
-            all_chunks.extend(new_chunks)
+            followup = f"{query}\n{critique}"[:500]
+            candidates = _hybrid_search(conn, followup, top_k=top_k + len(seen))
+            added = _add_new_chunks(all_chunks, seen, candidates,
+                                    token_budget, limit=top_k)
             previous_answer = answer
-            print(f"   📦 Total chunks now: {len(all_chunks)}")
+            print(f"   📦 Added {len(added)} new chunks → {len(all_chunks)} total")
+
+        report.append({
+            "round": round_num,
+            "prompt_tokens": draft_stats.get("prompt_tokens", 0),
+            "context_chunks": len(all_chunks) - len(added),
+            "new_chunks": len(added),
+            "seconds": time.time() - round_t0,
+            "sufficient": sufficient,
+        })
+
+        if sufficient or (round_num < max_rounds and not added):
+            break
+
+    # Per-round report
+    print(f"\n   📈 Round | prompt tokens | context chunks | new chunks | latency")
+    for r in report:
+        mark = " ✅" if r["sufficient"] else ""
+        print(f"   {r['round']:>5} | {r['prompt_tokens']:>13} | "
+              f"{r['context_chunks']:>14} | {r['new_chunks']:>10} | "
+              f"{r['seconds']:>6.1f}s{mark}")
 
-    # After all rounds, return the last answer
     elapsed = time.time() - t0
-    print(f"\n   ⚠️  Max rounds reached. Returning best answer.")
+    if report[-1]["sufficient"]:
+        print(f"\n   🎉 Answer deemed sufficient after {len(report)} round(s)!")
+    elif len(report) < max_rounds:
+        print(f"\n   ⏹️  No new context left to add. Returning best answer.")
+    else:
+        print(f"\n   ⚠️  Max rounds reached. Returning best answer.")
     print(f"   ⏱️  Total time: {elapsed:.1f}s")
     return answer
 
@@ -172,14 +287,18 @@ def main() -> int:
     parser.add_argument("--db", type=Path, default=DEFAULT_DB)
     parser.add_argument("--query", type=str, required=True)
     parser.add_argument("--max-rounds", type=int, default=MAX_ROUNDS)
+    parser.add_argument("--no-stream", action="store_true", default=False)
     args = parser.parse_args()
+    if args.max_rounds < 1:
+        parser.error("--max-rounds must be at least 1")
 
     try:
         conn = _connect_db(args.db)
         _add_embeddings(conn)
         _create_indexes(conn)
 
-        answer = self_rag(conn, args.query, args.max_rounds)
+        answer = self_rag(conn, args.query, args.max_rounds,
+                          stream=not args.no_stream)
 
         print(f"\n{'='*60}")
         print(f"📝 Final Answer:")
@@ -16,6 +16,7 @@ import argparse
 import sys
 import time
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 # NOTE: This imports from the example answer key. To use YOUR OWN Part 3 code
@@ -27,14 +28,15 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "docling-exercise-example-answers"))
 
 from docling_part3_answer import (  # ← change to docling_part3_exercise to use YOUR code (see NOTE above)
-    _connect_db, _search_vector, _search_bm25,
+    _connect_db, _search_vector, _search_bm25, _fetch_texts, _embed,
     _hybrid_search, _generate_answer,
     _add_embeddings, _create_indexes,
-    EMBED_MODEL, RRF_K,
+    RRF_K,
 )
-import ollama
 from openai import OpenAI
-import requests
+
+from hyde_cache import HydeGenerator
+from rerank_client import RerankClient
 
 # ── Remote GPU Models ────────────────────────────────────────────────────────
 chat_client = OpenAI(
@@ -46,14 +48,13 @@ CHAT_MODEL = "qwen3-vl-8b"
 RERANK_URL = "https://dev-8--qwen3-vl-reranker-2b-serve.modal.run/v1/rerank"
 RERANK_MODEL = "qwen3-vl-reranker-2b"
 
-def _rerank(query: str, documents: list[str], top_k: int = 3) -> list[tuple[str, float]]:
-    """Rerank documents using remote GPU reranker. Returns [(text, score), ...]."""
-    resp = requests.post(RERANK_URL, json={
-        "model": RERANK_MODEL, "query": query,
-        "documents": documents, "top_n": top_k,
-    })
-    results = resp.json()["results"]
-    return [(r["document"], r["relevance_score"]) for r in results]
+# Shared pooled client (keep-alive, timeout, retries, batching) – see
+# rerank_client.py.  _rerank(query, documents, top_k) → [(text, score), ...]
+reranker = RerankClient(RERANK_URL, RERANK_MODEL)
+_rerank = reranker.rerank
+
+# HyDE passages and their embeddings, cached with TTL + LRU (see hyde_cache.py).
+hyde = HydeGenerator(chat_client, CHAT_MODEL, embed_fn=_embed)
 
 DEFAULT_DB = Path(__file__).resolve().parent.parent / "docling-exercise-example-answers" / "output" / "rag_chunks.duckdb"
 
@@ -66,34 +67,26 @@ def hyde_search(conn, query: str, top_k: int = 5) -> list[dict]:
     """Search using HyDE: generate fake answer → embed it → vector search."""
     print(f"\n🔮 [HyDE] Generating hypothetical answer for: '{query}'")
 
-    # Step A: Generate a hypothetical answer
-    resp = chat_client.chat.completions.create(
-        model=CHAT_MODEL,
-        messages=[{"role": "user",
-                   "content": f"Write a short passage (~200 words) that answers: {query}"}],
-    )
-    fake_answer = resp.choices[0].message.content
-    print(f"   📝 Fake answer:")
+    # Step A: Generate a hypothetical answer (memoized per normalized query)
+    fake_answer, hyde_vec, cached = hyde.generate(query)
+    print(f"   📝 Fake answer{' (cached)' if cached else ''}:")
     print(f"   ┌{'─'*70}")
     for line in fake_answer.splitlines():
         print(f"   │ {line}")
     print(f"   └{'─'*70}")
 
-    # Step B: Embed the FAKE ANSWER (not the query!)
-    hyde_vec = ollama.embed(model=EMBED_MODEL, input=fake_answer)["embeddings"][0]
+    # Step B: Embed the FAKE ANSWER (not the query!) – done by hyde.generate()
     print(f"   📐 Embedded fake answer → {len(hyde_vec)}-dim vector")
 
     # Step C: Search with the fake answer's embedding
     vec_results = _search_vector(conn, hyde_vec, limit=top_k)
 
-    # Step D: Fetch text for each result
-    results = []
-    for chunk_id, score in vec_results:
-        row = conn.execute(
-            "SELECT chunk_id, text FROM rag_chunks WHERE chunk_id = ?",
-            [chunk_id],
-        ).fetchone()
-        results.append({"chunk_id": row[0], "text": row[1], "score": score})
+    # Step D: Fetch text for all results in one query
+    texts = _fetch_texts(conn, [chunk_id for chunk_id, _score in vec_results])
+    results = [
+        {"chunk_id": chunk_id, "text": texts[chunk_id], "score": score}
+        for chunk_id, score in vec_results
+    ]
 
     print(f"\n   ✅ Found {len(results)} chunks via HyDE:")
     for i, c in enumerate(results):
@@ -102,7 +95,6 @@ def hyde_search(conn, query: str, top_k: int = 5) -> list[dict]:
     return results
 
 
-
 # ═══════════════════════════════════════════════════════════════════════════
 # TODO 2 ✅: multi_query_search()
 # ═══════════════════════════════════════════════════════════════════════════
@@ -129,12 +121,29 @@ def multi_query_search(conn, query: str, top_k: int = 5) -> list[dict]:
         tag = "original" if i == 0 else f"variant {i}"
         print(f"      [{tag}] {q}")
 
-    # Step B: Search with each variant, accumulate RRF scores
+    # Step B: Search all variants concurrently, then accumulate RRF scores
+    # Embed every query in ONE batched call; the shared embedding cache then
+    # serves each _hybrid_search below without another round-trip.
+    _embed(all_queries)
+
+    # Run the per-query searches on a thread pool.  A DuckDB connection must
+    # not be shared across threads, so each search gets its own cursor.
+    cursors = [conn.cursor() for _ in all_queries]
+    try:
+        with ThreadPoolExecutor(max_workers=len(all_queries)) as pool:
+            per_query = list(pool.map(
+                lambda cur, q: _hybrid_search(cur, q, top_k=top_k),
+                cursors, all_queries,
+            ))
+    finally:
+        for cur in cursors:
+            cur.close()
+
+    # RRF merge once, in query order, after every search has finished.
     fused_scores: dict[int, float] = defaultdict(float)
     chunk_texts: dict[int, str] = {}
 
-    for q in all_queries:
-        results = _hybrid_search(conn, q, top_k=top_k)
+    for results in per_query:
         for rank, chunk in enumerate(results):
             cid = chunk["chunk_id"]
             fused_scores[cid] += 1.0 / (RRF_K + rank + 1)
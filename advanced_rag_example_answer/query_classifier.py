@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""Local query classifier for Path A's router – no LLM call on the hot path.
+
+Labels are the same three as ``classify_query()``: factual / conceptual /
+ambiguous.  Two signals are combined:
+
+  • **Nearest centroid** over query embeddings – each label's centroid is the
+    mean embedding of a handful of seed queries.  The query embedding is the
+    one retrieval computes anyway (served from the shared embedding cache),
+    so classification itself is a 3×1024 dot product.
+  • **Lexical features** – length, digits, acronyms like DITSO/GIRO, and the
+    question opener ("how many …" vs "why …").
+
+When the top two labels are closer than ``min_margin`` the classifier is not
+confident and defers to the LLM ``fallback`` (if one is given).
+
+Usage (from the other answer scripts in this folder):
+    from query_classifier import QueryClassifier
+
+    clf = QueryClassifier(embed_fn=_embed, fallback=classify_query)
+    label, confidence, source = clf.classify("What is the role of the DITSO?")
+
+Offline benchmark against the LLM labels on the workshop test questions
+(corpus.py + corpus_s17.py):
+    uv run --no-project --with duckdb --with ollama --with openai --with requests \
+        --with numpy advanced_rag_example_answer/query_classifier.py benchmark
+"""
+
+from __future__ import annotations
+
+import argparse
+import re
+import sys
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+import numpy as np
+
+LABELS = ("factual", "conceptual", "ambiguous")
+
+# Seed queries per label – their mean embedding is the label's centroid.
+SEED_QUERIES: dict[str, list[str]] = {
+    "factual": [
+        "How many attention heads does the base Transformer use?",
+        "What BLEU score did the big model reach on WMT 2014?",
+        "Who is responsible for approving the IT security policy?",
+        "When was the IT Security Working Group established?",
+        "What is the dimension of the model's hidden layers?",
+        "Which optimizer and learning rate schedule were used for training?",
+        "What does ISMC stand for and who chairs it?",
+        "What is the maximum password age in days?",
+    ],
+    "conceptual": [
+        "How does self-attention capture long-range dependencies?",
+        "Why is positional encoding needed in a Transformer?",
+        "Explain how multi-head attention works.",
+        "What is the purpose of segregation of duties?",
+        "How should security incidents be handled end to end?",
+        "Describe the trade-offs between recurrence and attention.",
+        "What does layer normalization contribute to training stability?",
+        "Why does scaled dot-product attention divide by the square root of d_k?",
+    ],
+    "ambiguous": [
+        "attention",
+        "security",
+        "transformer model",
+        "keys",
+        "cloud",
+        "tell me more",
+        "training",
+        "policy details",
+    ],
+}
+
+_FACTUAL_STARTS = ("who ", "when ", "where ", "which ", "how many ", "how much ",
+                   "how long ", "what year ", "what date ", "list ", "name ")
+_CONCEPTUAL_STARTS = ("how ", "why ", "explain ", "describe ", "what is ",
+                      "what are ", "what does ", "compare ")
+_ACRONYM = re.compile(r"\b[A-Z][A-Z0-9/.]{1,}\b")
+
+
+def lexical_features(query: str) -> dict[str, bool]:
+    """Cheap surface features of a query."""
+    q = query.strip()
+    lowered = q.lower() + " "
+    return {
+        "short": len(q.split()) <= 2,
+        "has_digit": any(ch.isdigit() for ch in q),
+        "has_acronym": _ACRONYM.search(q) is not None,
+        "factual_opener": lowered.startswith(_FACTUAL_STARTS),
+        "conceptual_opener": lowered.startswith(_CONCEPTUAL_STARTS),
+    }
+
+
+def classify_lexical(query: str) -> str:
+    """Rule-only classification from lexical_features() (no embeddings).
+
+    Very short queries are ambiguous; digits, acronyms or who/when/how-many
+    openers are factual; how/why/explain openers are conceptual; anything
+    else is ambiguous.
+    """
+    f = lexical_features(query)
+    if f["short"]:
+        return "ambiguous"
+    if f["has_digit"] or f["has_acronym"] or f["factual_opener"]:
+        return "factual"
+    if f["conceptual_opener"]:
+        return "conceptual"
+    return "ambiguous"
+
+
+def _lexical_scores(query: str) -> np.ndarray:
+    """Per-label lexical evidence in [0, 1], ordered like LABELS."""
+    f = lexical_features(query)
+    factual = (f["has_digit"] + f["has_acronym"] + f["factual_opener"]) / 3
+    conceptual = float(f["conceptual_opener"] and not f["factual_opener"])
+    ambiguous = float(f["short"])
+    return np.array([factual, conceptual, ambiguous], dtype=np.float32)
+
+
+class QueryClassifier:
+    """Nearest-centroid + lexical classifier with an optional LLM fallback."""
+
+    def __init__(
+        self,
+        embed_fn: Callable[[list[str]], list[list[float]]],
+        fallback: Callable[[str], str] | None = None,
+        *,
+        min_margin: float = 0.03,
+        lexical_weight: float = 0.1,
+        seeds: dict[str, list[str]] | None = None,
+    ) -> None:
+        self.embed_fn = embed_fn
+        self.fallback = fallback
+        self.min_margin = min_margin
+        self.lexical_weight = lexical_weight
+
+        seeds = seeds or SEED_QUERIES
+        rows = []
+        for label in LABELS:
+            vecs = np.asarray(embed_fn(seeds[label]), dtype=np.float32)
+            centroid = vecs.mean(axis=0)
+            rows.append(centroid / np.linalg.norm(centroid))
+        self._centroids = np.stack(rows)  # (3, dim), unit rows
+
+    def scores(self, query: str, query_vec: list[float] | None = None) -> np.ndarray:
+        """Combined per-label scores (cosine to centroid + lexical bonus)."""
+        if query_vec is None:
+            query_vec = self.embed_fn([query])[0]
+        v = np.asarray(query_vec, dtype=np.float32)
+        cosine = self._centroids @ (v / np.linalg.norm(v))
+        return cosine + self.lexical_weight * _lexical_scores(query)
+
+    def classify(
+        self, query: str, query_vec: list[float] | None = None,
+    ) -> tuple[str, float, str]:
+        """Return (label, confidence margin, source) – source is "local" or "llm"."""
+        s = self.scores(query, query_vec)
+        order = np.argsort(s)[::-1]
+        margin = float(s[order[0]] - s[order[1]])
+        if margin < self.min_margin and self.fallback is not None:
+            return self.fallback(query), margin, "llm"
+        return LABELS[order[0]], margin, "local"
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# Offline benchmark
+# ═══════════════════════════════════════════════════════════════════════════
+
+def _benchmark() -> int:
+    """Compare against classify_query() on the workshop test questions."""
+    import contextlib
+    import io
+
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+    import corpus
+    import corpus_s17
+    from path_a_modular_rag_answer import _embed, classify_query
+
+    quiet = contextlib.redirect_stdout(io.StringIO())
+    clf = QueryClassifier(embed_fn=_embed)  # no fallback: measure local alone
+
+    for name, module in (("synthetic", corpus), ("s17", corpus_s17)):
+        questions = [t["question"] for t in module.test_questions]
+        vecs = _embed(questions)
+
+        llm_labels, llm_secs = [], 0.0
+        for q in questions:
+            t0 = time.perf_counter()
+            with quiet:
+                llm_labels.append(classify_query(q))
+            llm_secs += time.perf_counter() - t0
+
+        local_labels, margins, local_secs = [], [], 0.0
+        for q, v in zip(questions, vecs):
+            t0 = time.perf_counter()
+            label, margin, _ = clf.classify(q, v)
+            local_secs += time.perf_counter() - t0
+            local_labels.append(label)
+            margins.append(margin)
+
+        rule_labels = [classify_lexical(q) for q in questions]
+        n = len(questions)
+        agree = sum(a == b for a, b in zip(local_labels, llm_labels))
+        rule_agree = sum(a == b for a, b in zip(rule_labels, llm_labels))
+        deferred = sum(m < clf.min_margin for m in margins)
+
+        print(f"\n📊 {name}: {n} questions")
+        print(f"   centroid+lexical agreement with LLM: {agree}/{n} ({agree / n:.0%})")
+        print(f"   rules-only agreement with LLM:       {rule_agree}/{n} ({rule_agree / n:.0%})")
+        print(f"   low-confidence (would defer to LLM): {deferred}/{n}")
+        print(f"   latency – local: {local_secs / n * 1e6:.0f} µs/query | "
+              f"LLM: {llm_secs / n * 1e3:.0f} ms/query")
+        for q, ll, lo, m in zip(questions, llm_labels, local_labels, margins):
+            mark = "✅" if ll == lo else "❌"
+            print(f"   {mark} llm={ll:<10} local={lo:<10} margin={m:.3f}  {q}")
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Local query classifier for Path A")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("benchmark",
+                        help="Compare accuracy/latency against the LLM classifier.")
+    parser.parse_args()
+    return _benchmark()
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""Shared reranker client for the advanced RAG paths.
+
+Replaces the per-file ``requests.post`` helper with one pooled client:
+
+  • a single ``requests.Session`` (keep-alive, connection pool sized to the
+    concurrency limit) instead of a new TCP/TLS handshake per call;
+  • a timeout and automatic retries with backoff on 429/5xx;
+  • large candidate lists split into batches that are scored concurrently
+    (bounded by ``max_concurrency``) and merged by relevance score;
+  • ``arerank()`` – an ``await``-able version so reranking can overlap with
+    other work (e.g. the next retrieval or an LLM call); concurrent awaits
+    are held to the same ``max_concurrency``.
+
+Usage (from the other answer scripts in this folder):
+    from rerank_client import RerankClient
+
+    reranker = RerankClient(RERANK_URL, RERANK_MODEL)
+    scored = reranker.rerank(query, texts, top_k=3)        # [(text, score), ...]
+    scored = await reranker.arerank(query, texts, top_k=3)
+
+Local stand-in server (implements the same ``/v1/rerank`` schema, scores by
+word overlap) for running the paths without the GPU endpoint:
+    python advanced_rag_example_answer/rerank_client.py serve --port 8765
+    # then point RerankClient at http://127.0.0.1:8765/v1/rerank
+
+Tests (run against the stand-in server):
+    uv run pytest tests/test_rerank_client.py
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import re
+import threading
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+class RerankClient:
+    """Pooled, retrying client for an OpenAI-style ``/v1/rerank`` endpoint."""
+
+    def __init__(
+        self,
+        url: str,
+        model: str,
+        *,
+        timeout: float = 30.0,
+        max_retries: int = 3,
+        batch_size: int = 32,
+        max_concurrency: int = 4,
+    ) -> None:
+        self.url = url
+        self.model = model
+        self.timeout = timeout
+        self.batch_size = batch_size
+        self.max_concurrency = max_concurrency
+
+        retry = Retry(
+            total=max_retries,
+            backoff_factor=0.5,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=frozenset({"POST"}),
+        )
+        adapter = HTTPAdapter(
+            pool_connections=1, pool_maxsize=max_concurrency, max_retries=retry,
+        )
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._pool = ThreadPoolExecutor(max_workers=max_concurrency)
+        # One semaphore per event loop: an asyncio.Semaphore can't be shared
+        # between loops (e.g. two asyncio.run() calls).
+        self._semaphores: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+    def rerank(self, query: str, documents: list[str],
+               top_k: int = 3) -> list[tuple[str, float]]:
+        """Rerank documents. Returns [(text, score), ...] best first."""
+        if not documents:
+            return []
+        batches = [documents[i:i + self.batch_size]
+                   for i in range(0, len(documents), self.batch_size)]
+        if len(batches) == 1:
+            scored = self._post(query, batches[0], top_n=min(top_k, len(documents)))
+        else:
+            # Every batch must return all its scores so the merge is exact.
+            scored = [pair for part in self._pool.map(
+                lambda b: self._post(query, b, top_n=len(b)), batches)
+                for pair in part]
+            scored.sort(key=lambda pair: pair[1], reverse=True)
+        return scored[:top_k]
+
+    async def arerank(self, query: str, documents: list[str],
+                      top_k: int = 3) -> list[tuple[str, float]]:
+        """Async ``rerank()`` – runs on a worker thread, awaitable.
+
+        At most ``max_concurrency`` calls run at once; the rest wait here
+        instead of piling up on the default executor.
+        """
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = self._semaphores[loop] = asyncio.Semaphore(self.max_concurrency)
+        async with semaphore:
+            return await asyncio.to_thread(self.rerank, query, documents, top_k)
+
+    def close(self) -> None:
+        self._pool.shutdown(wait=False)
+        self.session.close()
+
+    def _post(self, query: str, documents: list[str],
+              top_n: int) -> list[tuple[str, float]]:
+        resp = self.session.post(self.url, json={
+            "model": self.model, "query": query,
+            "documents": documents, "top_n": top_n,
+        }, timeout=self.timeout)
+        resp.raise_for_status()
+        results = resp.json()["results"]
+        return [(r["document"], r["relevance_score"]) for r in results]
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# Local stand-in server
+# ═══════════════════════════════════════════════════════════════════════════
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+class _StubRerankHandler(BaseHTTPRequestHandler):
+    """Minimal ``POST /v1/rerank``: score = share of query words in the doc."""
+
+    def do_POST(self) -> None:  # noqa: N802 – http.server naming
+        if self.path.rstrip("/") != "/v1/rerank":
+            self.send_error(404)
+            return
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        with self.server.lock:
+            self.server.requests += 1
+            failing = self.server.fail_first > 0
+            self.server.fail_first -= failing
+            self.server.in_flight += 1
+            self.server.max_in_flight = max(self.server.max_in_flight,
+                                            self.server.in_flight)
+        try:
+            if failing:
+                self.send_error(503)
+                return
+            if self.server.delay:
+                time.sleep(self.server.delay)
+            self._send_results(body)
+        finally:
+            with self.server.lock:
+                self.server.in_flight -= 1
+
+    def _send_results(self, body: dict) -> None:
+        q_words = set(_WORD.findall(body["query"].lower()))
+        results = []
+        for i, doc in enumerate(body["documents"]):
+            d_words = set(_WORD.findall(doc.lower()))
+            score = len(q_words & d_words) / len(q_words) if q_words else 0.0
+            results.append({"index": i, "document": doc, "relevance_score": score})
+        results.sort(key=lambda r: r["relevance_score"], reverse=True)
+        top_n = body.get("top_n") or len(results)
+
+        payload = json.dumps({"model": body.get("model"),
+                              "results": results[:top_n]}).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format: str, *args: object) -> None:
+        pass
+
+
+def _make_server(host: str, port: int, fail_first: int = 0,
+                 delay: float = 0.0) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer((host, port), _StubRerankHandler)
+    server.lock = threading.Lock()
+    server.requests = 0             # POSTs received, failed ones included
+    server.fail_first = fail_first  # answer this many requests with 503 first
+    server.delay = delay            # seconds to wait before answering
+    server.in_flight = 0
+    server.max_in_flight = 0        # most requests handled at the same time
+    return server
+
+
+def serve_stub(host: str = "127.0.0.1", port: int = 0,
+               fail_first: int = 0, delay: float = 0.0) -> ThreadingHTTPServer:
+    """Start the stand-in reranker in a background thread and return it.
+
+    ``port=0`` picks a free port; read it back from ``server.server_port``.
+    ``fail_first`` makes the first N requests fail with 503 (to exercise
+    retries); ``delay`` slows every answer down.  ``server.requests`` counts
+    every request received, ``server.max_in_flight`` the peak concurrency.
+    Call ``server.shutdown()`` when done.
+    """
+    server = _make_server(host, port, fail_first, delay)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Reranker client tools")
+    commands = parser.add_subparsers(dest="command", required=True)
+    serve = commands.add_parser("serve", help="Run the local stand-in /v1/rerank server.")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    server = _make_server(args.host, args.port)
+    print(f"🧪 Stand-in reranker on http://{args.host}:{args.port}/v1/rerank")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -35,14 +35,45 @@ Run with (from the workshop/ folder):
     uv run --no-project --with docling --with transformers \\
         --with typing-extensions workshop--example-answers/docling_part1_answer.py \\
         -i attention.pdf
+
+Batch mode – convert every PDF/DOCX in a directory (or matching a glob) on a
+process pool.  Each document gets its own output sub-folder and the run
+writes a ``manifest.json`` listing the status of every input::
+
+    ... docling_part1_answer.py --batch docs/ --workers 4
+    ... docling_part1_answer.py --batch "docs/**/*.pdf"
+
+Picture descriptions run as their own stage after conversion: up to
+``--vlm-concurrency`` pictures are sent to the VLM at once and results are
+cached by PNG content hash (see picture_describer.py, which also provides a
+local stand-in VLM server).  ``--vlm-concurrency 0`` uses Docling's built-in
+one-picture-at-a-time stage instead.
+
+Re-runs are incremental: ``output/sources.json`` remembers the SHA-256 of
+every converted file, and a file whose bytes (and pipeline settings) are
+unchanged is skipped and its previous output reused.  ``--force`` converts
+it again anyway.
+
+The chunker's tokenizer is saved to ``output/tokenizer/`` the first time it
+is downloaded and loaded from there (offline) afterwards.  Measure chunker
+throughput with::
+
+    ... docling_part1_answer.py --benchmark-chunker -i attention.pdf
 """
 
 from __future__ import annotations
 
 import argparse
+import glob
+import hashlib
 import json
+import os
+import shutil
 import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from datetime import datetime
+from io import BytesIO
 from pathlib import Path
 
 # ---------------------------------------------------------------------------
@@ -75,19 +106,30 @@ from docling_core.transforms.serializer.markdown import (
 # Core document types.  ``DoclingDocument`` is the parsed document tree;
 # ``PictureItem`` and ``TableItem`` are typed elements you encounter when
 # iterating over the tree with ``doc.iterate_items()``.
-from docling_core.types.doc.document import DoclingDocument, PictureItem, TableItem
+from docling_core.types.doc.document import (
+    DescriptionMetaField,
+    DoclingDocument,
+    PictureItem,
+    PictureMeta,
+    TableItem,
+)
 
 # HuggingFace tokenizer – used by HybridChunker to count tokens and respect
 # the embedding model's context window when deciding chunk boundaries.
 from transformers import AutoTokenizer
 from typing_extensions import override
 
+from picture_describer import PictureDescriber
+
 # ---------------------------------------------------------------------------
 # Configuration constants
 # ---------------------------------------------------------------------------
 SUPPORTED_SUFFIXES = {".pdf", ".docx"}
 DEFAULT_INPUT = Path(__file__).resolve().parent / "attention.pdf"
 DEFAULT_OUTPUT_ROOT = Path(__file__).resolve().parent / "output"
+# Chunk "source" ids are written relative to this folder, so they survive a
+# moved or re-cloned checkout.
+REPO_ROOT = Path(__file__).resolve().parent.parent
 
 # VLM endpoint hosted on Modal (Qwen3-VL 8B).  Docling calls this endpoint
 # for every detected picture to generate a short textual description.
@@ -100,9 +142,42 @@ DEFAULT_PICTURE_PROMPT = "Describe the image in 1-3 concise sentences. Be accura
 # so that chunk lengths align with the model's context window.
 EMBED_MODEL_ID = "Qwen/Qwen3-Embedding-0.6B"
 
+# Local snapshot of the tokenizer files.  Once saved, the chunker loads the
+# tokenizer from here with local_files_only=True – no Hugging Face Hub
+# lookups at startup, and the same tokenizer on every run.  Delete the
+# folder to refresh it.
+TOKENIZER_DIR = DEFAULT_OUTPUT_ROOT / "tokenizer" / EMBED_MODEL_ID.replace("/", "--")
+
+# Token budget per chunk (the embedding model's context window we target).
+CHUNK_MAX_TOKENS = 512
+
 # Higher scale → larger (sharper) page/picture images at the cost of memory.
 IMAGE_RESOLUTION_SCALE = 2.0
 
+# Pictures described concurrently by the separate picture-description stage
+# (0 = let Docling describe them inside the conversion, one at a time).
+DEFAULT_VLM_CONCURRENCY = 8
+
+# Pictures covering less of their page than this (icons, logos) are not
+# described – Docling's picture_area_threshold, applied by both stages.
+PICTURE_AREA_THRESHOLD = 0.05
+
+# Descriptions are cached here as <sha256>.txt, keyed by model + prompt + PNG.
+PICTURE_CACHE_DIR = DEFAULT_OUTPUT_ROOT / "picture_cache"
+
+# Remembers the content hash and output folder of every converted source file
+# so unchanged inputs can be skipped on the next run.
+SOURCE_INDEX_PATH = DEFAULT_OUTPUT_ROOT / "sources.json"
+
+# Bumped when the layout of chunks.json changes (2: per-chunk "source",
+# 3: "source" relative to REPO_ROOT), so outputs written in an older layout
+# are converted again.
+CHUNKS_FORMAT = 3
+
+# Default number of worker processes in --batch mode.  Every worker holds its
+# own DocumentConverter (layout/table models), so memory grows per worker.
+DEFAULT_BATCH_WORKERS = max(1, min(4, os.cpu_count() or 1))
+
 
 # ---------------------------------------------------------------------------
 # Helper functions – input handling & output directory
@@ -146,22 +221,118 @@ def _prompt_for_input(default_path: Path) -> Path:
     return Path(user_input)
 
 
+def _make_subdirs(output_dir: Path) -> None:
+    """Create the images/, tables/, chunks/ sub-folders of one document's output."""
+    (output_dir / "images").mkdir(parents=True, exist_ok=False)
+    (output_dir / "tables").mkdir(parents=True, exist_ok=False)
+    (output_dir / "chunks").mkdir(parents=True, exist_ok=False)
+
+
 def _create_output_dir(root: Path) -> Path:
     """Create a timestamped output directory with images/, tables/, chunks/ sub-folders."""
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     output_dir = root / timestamp
-    (output_dir / "images").mkdir(parents=True, exist_ok=False)
-    (output_dir / "tables").mkdir(parents=True, exist_ok=False)
-    (output_dir / "chunks").mkdir(parents=True, exist_ok=False)
+    _make_subdirs(output_dir)
     return output_dir
 
 
+# ---------------------------------------------------------------------------
+# Incremental runs – skip sources whose content has not changed
+# ---------------------------------------------------------------------------
+
+
+def _file_sha256(path: Path) -> str:
+    """SHA-256 of a file's bytes, read in 1 MiB blocks."""
+    digest = hashlib.sha256()
+    with path.open("rb") as fh:
+        for block in iter(lambda: fh.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _source_id(path: Path) -> str:
+    """Path of a source file relative to REPO_ROOT (absolute if outside it)."""
+    resolved = path.resolve()
+    try:
+        return resolved.relative_to(REPO_ROOT).as_posix()
+    except ValueError:
+        return resolved.as_posix()
+
+
+def _pipeline_signature(vlm_model: str) -> str:
+    """Settings that change the output for the same input bytes."""
+    return json.dumps(
+        [EMBED_MODEL_ID, vlm_model, DEFAULT_PICTURE_PROMPT, IMAGE_RESOLUTION_SCALE,
+         PICTURE_AREA_THRESHOLD, CHUNKS_FORMAT]
+    )
+
+
+def _load_source_index() -> dict:
+    """Read ``sources.json`` → {source path: {sha256, pipeline, output_dir}}."""
+    if not SOURCE_INDEX_PATH.exists():
+        return {}
+    return json.loads(SOURCE_INDEX_PATH.read_text(encoding="utf-8"))
+
+
+def _save_source_index(index: dict) -> None:
+    """Write ``sources.json`` (write-then-rename, so never half-written)."""
+    SOURCE_INDEX_PATH.parent.mkdir(parents=True, exist_ok=True)
+    tmp = SOURCE_INDEX_PATH.with_name(f"{SOURCE_INDEX_PATH.name}.{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(index, indent=2, ensure_ascii=False), encoding="utf-8")
+    os.replace(tmp, SOURCE_INDEX_PATH)
+
+
+def _previous_output(
+    index: dict, input_path: Path, sha256: str, signature: str
+) -> Path | None:
+    """Output folder of an earlier identical conversion, if it still exists."""
+    entry = index.get(str(input_path))
+    if not entry or entry["sha256"] != sha256 or entry["pipeline"] != signature:
+        return None
+    output_dir = DEFAULT_OUTPUT_ROOT / entry["output_dir"]
+    if not (output_dir / "chunks" / "chunks.json").exists():
+        return None
+    return output_dir
+
+
+def _record_source(
+    index: dict, input_path: Path, sha256: str, signature: str, output_dir: Path
+) -> None:
+    """Remember a successful conversion in the (in-memory) source index."""
+    index[str(input_path)] = {
+        "sha256": sha256,
+        "pipeline": signature,
+        "output_dir": output_dir.relative_to(DEFAULT_OUTPUT_ROOT).as_posix(),
+    }
+
+
+def _collect_inputs(spec: str) -> list[Path]:
+    """Expand a directory or glob pattern into the supported documents it holds.
+
+    A directory is searched recursively.  Anything else is treated as a glob
+    (``**`` is allowed).  Results are de-duplicated and sorted.
+    """
+    expanded = Path(spec).expanduser()
+    if expanded.is_dir():
+        candidates = expanded.rglob("*")
+    else:
+        candidates = (Path(p) for p in glob.glob(str(expanded), recursive=True))
+    found = {
+        p.resolve()
+        for p in candidates
+        if p.is_file() and p.suffix.lower() in SUPPORTED_SUFFIXES
+    }
+    return sorted(found)
+
+
 # ---------------------------------------------------------------------------
 # Docling pipeline & converter setup
 # ---------------------------------------------------------------------------
 
 
-def _build_pdf_pipeline(vlm_url: str, model: str) -> PdfPipelineOptions:
+def _build_pdf_pipeline(
+    vlm_url: str, model: str, describe_pictures: bool = True
+) -> PdfPipelineOptions:
     """Configure the PDF processing pipeline.
 
     ``PdfPipelineOptions`` controls every stage of Docling's PDF analysis:
@@ -172,9 +343,13 @@ def _build_pdf_pipeline(vlm_url: str, model: str) -> PdfPipelineOptions:
       and individual pictures so we can save them as PNGs later.
     - ``do_table_structure`` – run table-structure recognition so tables can be
       exported as Markdown.
+
+    With ``describe_pictures=False`` the VLM is not called during conversion;
+    ``_describe_pictures()`` then captions the pictures afterwards, many at
+    a time.
     """
     pipeline_options = PdfPipelineOptions()
-    pipeline_options.do_picture_description = True
+    pipeline_options.do_picture_description = describe_pictures
     pipeline_options.picture_description_options = PictureDescriptionApiOptions(
         url=vlm_url,
         params={
@@ -183,6 +358,7 @@ def _build_pdf_pipeline(vlm_url: str, model: str) -> PdfPipelineOptions:
         },
         prompt=DEFAULT_PICTURE_PROMPT,
         timeout=90,
+        picture_area_threshold=PICTURE_AREA_THRESHOLD,
     )
     pipeline_options.enable_remote_services = True
     pipeline_options.generate_page_images = True
@@ -192,7 +368,9 @@ def _build_pdf_pipeline(vlm_url: str, model: str) -> PdfPipelineOptions:
     return pipeline_options
 
 
-def _build_converter(vlm_url: str, model: str) -> DocumentConverter:
+def _build_converter(
+    vlm_url: str, model: str, describe_pictures: bool = True
+) -> DocumentConverter:
     """Create a ``DocumentConverter`` wired to our PDF pipeline.
 
     ``DocumentConverter`` is Docling's main entry-point.  You call
@@ -202,7 +380,7 @@ def _build_converter(vlm_url: str, model: str) -> DocumentConverter:
     ``format_options`` maps each input format to its pipeline configuration.
     Here we only configure PDF; DOCX uses Docling's defaults.
     """
-    pipeline_options = _build_pdf_pipeline(vlm_url, model)
+    pipeline_options = _build_pdf_pipeline(vlm_url, model, describe_pictures)
     return DocumentConverter(
         format_options={
             InputFormat.PDF: PdfFormatOption(pipeline_options=pipeline_options),
@@ -288,6 +466,74 @@ def _extract_images(doc: DoclingDocument, images_dir: Path) -> int:
     return count
 
 
+# ---------------------------------------------------------------------------
+# Picture descriptions – separate, concurrent stage
+# ---------------------------------------------------------------------------
+
+
+def _build_describer(vlm_url: str, model: str, concurrency: int) -> PictureDescriber:
+    """Create the concurrent picture describer used when ``concurrency > 0``."""
+    return PictureDescriber(
+        vlm_url,
+        model,
+        DEFAULT_PICTURE_PROMPT,
+        timeout=90,
+        max_in_flight=concurrency,
+        cache_dir=PICTURE_CACHE_DIR,
+    )
+
+
+def _is_large_picture(doc: DoclingDocument, picture: PictureItem) -> bool:
+    """Same size filter as Docling's picture-description stage.
+
+    The picture's bounding box must cover at least ``PICTURE_AREA_THRESHOLD``
+    of its page; pictures without provenance or page size are kept.
+    """
+    if not picture.prov:
+        return True
+    prov = picture.prov[0]  # a PictureItem has at most one provenance
+    page = doc.pages.get(prov.page_no)
+    if page is None:
+        return True
+    page_area = page.size.width * page.size.height
+    return page_area <= 0 or prov.bbox.area() / page_area >= PICTURE_AREA_THRESHOLD
+
+
+def _describe_pictures(doc: DoclingDocument, describer: PictureDescriber) -> int:
+    """Caption the pictures in ``doc``, storing each in ``item.meta.description``.
+
+    This is the same annotation Docling's ``do_picture_description`` stage
+    produces, so ``_extract_images`` and ``AnnotationPictureSerializer``
+    work unchanged – including its size filter: pictures smaller than
+    ``PICTURE_AREA_THRESHOLD`` of the page are skipped.  All pictures are
+    sent in one ``describe_many()`` call (concurrent, cached by PNG bytes).
+    Returns the number described.
+    """
+    pictures: list[PictureItem] = []
+    pngs: list[bytes] = []
+    for element, _level in doc.iterate_items():
+        if isinstance(element, PictureItem) and _is_large_picture(doc, element):
+            image = element.get_image(doc)
+            if image is None:
+                continue
+            buffer = BytesIO()
+            image.save(buffer, format="PNG")
+            pictures.append(element)
+            pngs.append(buffer.getvalue())
+
+    described = 0
+    for element, text in zip(pictures, describer.describe_many(pngs)):
+        if text is None:
+            continue
+        description = DescriptionMetaField(text=text, created_by=describer.model)
+        if element.meta is None:
+            element.meta = PictureMeta(description=description)
+        else:
+            element.meta.description = description
+        described += 1
+    return described
+
+
 # ---------------------------------------------------------------------------
 # Custom serializer – controls how pictures appear inside chunk text
 # ---------------------------------------------------------------------------
@@ -379,8 +625,8 @@ def _build_chunker() -> HybridChunker:
     pictures are serialized with their VLM descriptions (see above).
     """
     tokenizer = HuggingFaceTokenizer(
-        tokenizer=AutoTokenizer.from_pretrained(EMBED_MODEL_ID),
-        max_tokens=512,
+        tokenizer=_load_tokenizer(),
+        max_tokens=CHUNK_MAX_TOKENS,
     )
     return HybridChunker(
         tokenizer=tokenizer,
@@ -388,8 +634,41 @@ def _build_chunker() -> HybridChunker:
     )
 
 
+def _load_tokenizer():
+    """Load the embedding model's tokenizer from the local snapshot.
+
+    The first call (no snapshot yet) downloads it from the Hub and saves it
+    to ``TOKENIZER_DIR``; every later call is offline.
+    """
+    if (TOKENIZER_DIR / "tokenizer_config.json").exists():
+        return AutoTokenizer.from_pretrained(TOKENIZER_DIR, local_files_only=True)
+    tokenizer = AutoTokenizer.from_pretrained(EMBED_MODEL_ID)
+    # Save next to the final folder, then rename: batch workers starting at
+    # the same time never see (or load) a half-written snapshot.
+    staging = TOKENIZER_DIR.with_name(f"{TOKENIZER_DIR.name}.{os.getpid()}.tmp")
+    tokenizer.save_pretrained(staging)
+    try:
+        os.replace(staging, TOKENIZER_DIR)
+    except OSError:
+        shutil.rmtree(staging, ignore_errors=True)  # another worker won the race
+    return tokenizer
+
+
+# Built on first use and shared by every document this process chunks
+# (including all documents handled by one --batch worker).
+_chunker: HybridChunker | None = None
+
+
+def _get_chunker() -> HybridChunker:
+    """Return the process-wide ``HybridChunker``, building it on first use."""
+    global _chunker
+    if _chunker is None:
+        _chunker = _build_chunker()
+    return _chunker
+
+
 def _write_chunks(
-    doc: DoclingDocument, chunks_dir: Path, document_name: str
+    doc: DoclingDocument, chunks_dir: Path, document_name: str, source: str
 ) -> int:
     """Chunk the document and write all chunks to a single ``chunks.json``.
 
@@ -406,9 +685,13 @@ def _write_chunks(
     * ``chunk.meta.headings`` is a list of ancestor headings from the
       document tree.  The first entry is the immediate section title.
 
+    ``source`` (the input path relative to the repo, see _source_id())
+    identifies the document uniquely – ``document_name`` is just the stem,
+    so ``a.pdf`` and ``a.docx`` share it.  Part 2 syncs its table per ``source``.
+
     The resulting JSON array is ready for embedding and vector-store ingestion.
     """
-    chunker = _build_chunker()
+    chunker = _get_chunker()
     all_chunks: list[dict] = []
     for chunk in chunker.chunk(dl_doc=doc):
         # contextualize() converts the chunk to text, prepending headings.
@@ -437,6 +720,7 @@ def _write_chunks(
                 "text": chunk_text,
                 "page_numbers": page_numbers,
                 "document_name": document_name,
+                "source": source,
                 "section_title": section_title,
             }
         )
@@ -448,6 +732,286 @@ def _write_chunks(
     return len(all_chunks)
 
 
+# ---------------------------------------------------------------------------
+# Per-document pipeline (shared by single-file and batch mode)
+# ---------------------------------------------------------------------------
+
+
+def _process_document(
+    converter: DocumentConverter,
+    input_path: Path,
+    output_dir: Path,
+    describer: PictureDescriber | None = None,
+) -> dict:
+    """Convert one document and write its images, tables and chunks.
+
+    ``output_dir`` must already contain the images/, tables/ and chunks/
+    sub-folders.  If ``describer`` is given, pictures are captioned after
+    conversion (the converter must then be built with
+    ``describe_pictures=False``).  Returns the number of items written per kind.
+    """
+    # converter.convert() runs the full Docling pipeline and returns a
+    # ConversionResult.  The .document attribute is the parsed DoclingDocument.
+    print(f"Starting conversion: {input_path}")
+    result = converter.convert(str(input_path))
+    doc = result.document
+
+    # Docling's own stage only runs in the PDF pipeline; DOCX pictures stay
+    # undescribed in both modes.
+    if describer is not None and result.input.format == InputFormat.PDF:
+        print(f"Describing pictures (up to {describer.max_in_flight} at a time)...")
+        start = time.perf_counter()
+        described = _describe_pictures(doc, describer)
+        stats = describer.stats()
+        print(
+            f"Described {described} pictures in {time.perf_counter() - start:.1f}s "
+            f"(cache hits so far: {stats['hits']}, VLM calls: {stats['misses']})"
+        )
+
+    print("Extracting picture PNGs...")
+    image_count = _extract_images(doc, output_dir / "images")
+
+    print("Extracting table Markdown...")
+    table_count = _extract_tables(doc, output_dir / "tables")
+
+    print("Running HybridChunker with picture annotations...")
+    chunk_count = _write_chunks(
+        doc, output_dir / "chunks", document_name=input_path.stem,
+        source=_source_id(input_path),
+    )
+    return {"images": image_count, "tables": table_count, "chunks": chunk_count}
+
+
+# ---------------------------------------------------------------------------
+# Batch mode – one DocumentConverter per worker process
+# ---------------------------------------------------------------------------
+# Building a DocumentConverter loads the layout and table-structure models,
+# which takes far longer than converting a short PDF.  Each worker builds its
+# converter once (in the pool initializer) and reuses it for every document
+# it is handed.
+
+_worker_converter: DocumentConverter | None = None
+_worker_describer: PictureDescriber | None = None
+
+
+def _init_worker(vlm_url: str, model: str, vlm_concurrency: int) -> None:
+    """Process-pool initializer: build this worker's converter (and describer)."""
+    global _worker_converter, _worker_describer
+    _worker_converter = _build_converter(
+        vlm_url, model, describe_pictures=vlm_concurrency <= 0
+    )
+    if vlm_concurrency > 0:
+        _worker_describer = _build_describer(vlm_url, model, vlm_concurrency)
+
+
+def _convert_in_worker(input_path: Path, output_dir: Path) -> dict:
+    """Run ``_process_document`` in a worker; never raises.
+
+    Any error is captured in the returned record so that one broken file
+    does not abort the rest of the batch.
+    """
+    start = time.perf_counter()
+    record: dict = {"source": str(input_path)}
+    try:
+        _make_subdirs(output_dir)
+        record.update(_process_document(
+            _worker_converter, input_path, output_dir, _worker_describer
+        ))
+        record["status"] = "ok"
+    except Exception as exc:
+        record["status"] = "failed"
+        record["error"] = f"{type(exc).__name__}: {exc}"
+    record["seconds"] = round(time.perf_counter() - start, 2)
+    return record
+
+
+def _document_dir_names(inputs: list[Path]) -> list[str]:
+    """One output sub-folder name per input, based on the file stem.
+
+    Stems that repeat (``a.pdf`` + ``a.docx``, or same-named files in
+    different folders) get a numeric suffix so no two documents share a folder.
+    """
+    names: list[str] = []
+    used: set[str] = set()
+    for path in inputs:
+        name, n = path.stem, 1
+        while name in used:
+            n += 1
+            name = f"{path.stem}-{n}"
+        used.add(name)
+        names.append(name)
+    return names
+
+
+def _write_manifest(batch_dir: Path, records: list[dict], workers: int) -> Path:
+    """Write ``manifest.json`` for a batch run (sorted by source path)."""
+    ordered = sorted(records, key=lambda r: r["source"])
+    manifest = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "workers": workers,
+        "succeeded": sum(r["status"] == "ok" for r in ordered),
+        "unchanged": sum(r["status"] == "unchanged" for r in ordered),
+        "failed": sum(r["status"] == "failed" for r in ordered),
+        "documents": ordered,
+    }
+    manifest_path = batch_dir / "manifest.json"
+    manifest_path.write_text(
+        json.dumps(manifest, indent=2, ensure_ascii=False), encoding="utf-8"
+    )
+    return manifest_path
+
+
+def _run_batch(
+    spec: str,
+    vlm_url: str,
+    model: str,
+    workers: int,
+    vlm_concurrency: int,
+    force: bool = False,
+) -> int:
+    """Convert every document matched by ``spec`` on a process pool.
+
+    Output layout::
+
+        output/<timestamp>/
+            manifest.json
+            <document-stem>/images/  tables/  chunks/chunks.json
+            ...
+
+    Documents whose content is unchanged since an earlier run are not
+    converted again; the manifest points ``output_dir`` (relative to
+    ``output/``) at their previous folder.  Returns the process exit code:
+    0 if no document failed, 1 otherwise.
+    """
+    inputs = _collect_inputs(spec)
+    if not inputs:
+        print(f"Error: no PDF/DOCX files found for '{spec}'", file=sys.stderr)
+        return 1
+
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    batch_dir = DEFAULT_OUTPUT_ROOT / timestamp
+    batch_dir.mkdir(parents=True, exist_ok=False)
+
+    index = _load_source_index()
+    signature = _pipeline_signature(model)
+    hashes = {path: _file_sha256(path) for path in inputs}
+    records: list[dict] = []
+    todo: list[tuple[Path, str]] = []
+    for path, name in zip(inputs, _document_dir_names(inputs)):
+        previous = None if force else _previous_output(
+            index, path, hashes[path], signature
+        )
+        if previous is None:
+            todo.append((path, name))
+        else:
+            records.append({
+                "source": str(path),
+                "output_dir": previous.relative_to(DEFAULT_OUTPUT_ROOT).as_posix(),
+                "status": "unchanged",
+            })
+    if records:
+        print(f"Skipping {len(records)} unchanged document(s).")
+    workers = max(1, min(workers, len(todo) or 1))
+    _write_manifest(batch_dir, records, workers)
+    print(f"Batch: {len(todo)} documents on {workers} worker process(es)")
+
+    start = time.perf_counter()
+    # Building a worker converter loads the Docling models – skip the pool
+    # entirely when every document is unchanged.
+    if todo:
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(vlm_url, model, vlm_concurrency),
+        ) as pool:
+            futures = {
+                pool.submit(_convert_in_worker, path, batch_dir / name): (path, name)
+                for path, name in todo
+            }
+            for future in as_completed(futures):
+                path, name = futures[future]
+                try:
+                    record = future.result()
+                except Exception as exc:
+                    # The worker process itself died (e.g. killed for memory);
+                    # _convert_in_worker never gets the chance to report it.
+                    record = {"source": str(path), "status": "failed",
+                              "error": f"{type(exc).__name__}: {exc}"}
+                record["output_dir"] = f"{batch_dir.name}/{name}"
+                records.append(record)
+                if record["status"] == "ok":
+                    _record_source(index, path, hashes[path], signature, batch_dir / name)
+                    _save_source_index(index)
+                # Rewrite the manifest as we go so an interrupted run still
+                # records every document that finished.
+                _write_manifest(batch_dir, records, workers)
+                if record["status"] == "ok":
+                    print(f"[{len(records)}/{len(inputs)}] OK     {path.name} "
+                          f"({record['seconds']}s) – images {record['images']}, "
+                          f"tables {record['tables']}, chunks {record['chunks']}")
+                else:
+                    print(f"[{len(records)}/{len(inputs)}] FAILED {path.name}: "
+                          f"{record['error']}")
+
+    manifest_path = _write_manifest(batch_dir, records, workers)
+    failed = sum(r["status"] == "failed" for r in records)
+    unchanged = sum(r["status"] == "unchanged" for r in records)
+    print("Batch complete.")
+    print(f"Succeeded: {len(records) - failed - unchanged} | Unchanged: {unchanged} "
+          f"| Failed: {failed} | Wall time: {time.perf_counter() - start:.1f}s")
+    print(f"Manifest: {manifest_path}")
+    return 1 if failed else 0
+
+
+# ---------------------------------------------------------------------------
+# Chunker benchmark
+# ---------------------------------------------------------------------------
+
+
+def _benchmark_chunker(input_path: Path, repeats: int = 3) -> int:
+    """Time tokenizer/chunker setup and chunking throughput on one document.
+
+    The document is converted once (without picture descriptions, so the
+    VLM is not involved); chunking is then repeated ``repeats`` times.
+    """
+    print(f"Converting {input_path} (picture description off)...")
+    converter = _build_converter(DEFAULT_VLM_URL, DEFAULT_VLM_MODEL, describe_pictures=False)
+    doc = converter.convert(str(input_path)).document
+
+    start = time.perf_counter()
+    chunker = _get_chunker()
+    first_build = time.perf_counter() - start
+
+    start = time.perf_counter()
+    _get_chunker()
+    reuse = time.perf_counter() - start
+
+    start = time.perf_counter()
+    _build_chunker()
+    rebuild = time.perf_counter() - start
+
+    timings: list[float] = []
+    chunk_count = 0
+    for _ in range(repeats):
+        start = time.perf_counter()
+        texts = [chunker.contextualize(chunk=c) for c in chunker.chunk(dl_doc=doc)]
+        timings.append(time.perf_counter() - start)
+        chunk_count = len(texts)
+    token_count = sum(chunker.tokenizer.count_tokens(text) for text in texts)
+
+    best = min(timings)
+    print("Chunker benchmark")
+    print(f"  Chunker build (first, cold):   {first_build * 1000:8.1f} ms")
+    print(f"  Chunker build (snapshot, new): {rebuild * 1000:8.1f} ms")
+    print(f"  Chunker reuse (singleton):     {reuse * 1000:8.3f} ms")
+    print(f"  Chunks per run:  {chunk_count} ({token_count} tokens)")
+    print(
+        f"  Chunking (best of {repeats}): {best:.2f}s → "
+        f"{chunk_count / best:.1f} chunks/s, {token_count / best:.0f} tokens/s"
+    )
+    return 0
+
+
 def _build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(
         description=(
@@ -461,6 +1025,23 @@ def _build_parser() -> argparse.ArgumentParser:
         type=Path,
         help="Path to a PDF or DOCX file (if omitted, you will be prompted).",
     )
+    parser.add_argument(
+        "-b",
+        "--batch",
+        metavar="DIR_OR_GLOB",
+        help="Convert every PDF/DOCX in a directory or matching a glob pattern.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=DEFAULT_BATCH_WORKERS,
+        help=f"Worker processes for --batch (default: {DEFAULT_BATCH_WORKERS}).",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Convert again even if a source file is unchanged since the last run.",
+    )
     parser.add_argument(
         "--vlm-url",
         default=DEFAULT_VLM_URL,
@@ -471,6 +1052,20 @@ def _build_parser() -> argparse.ArgumentParser:
         default=DEFAULT_VLM_MODEL,
         help="Model name for the VLM endpoint.",
     )
+    parser.add_argument(
+        "--vlm-concurrency",
+        type=int,
+        default=DEFAULT_VLM_CONCURRENCY,
+        help=(
+            "Pictures described in parallel after conversion "
+            f"(default: {DEFAULT_VLM_CONCURRENCY}; 0 = Docling's sequential stage)."
+        ),
+    )
+    parser.add_argument(
+        "--benchmark-chunker",
+        action="store_true",
+        help="Report chunker setup time and chunks/s, tokens/s on the input.",
+    )
     return parser
 
 
@@ -479,45 +1074,71 @@ def main(argv: list[str] | None = None) -> int:
 
     Steps:
     1. Resolve the input document path (CLI arg or interactive prompt).
-    2. Build a ``DocumentConverter`` with VLM picture-description enabled.
+    2. Build a ``DocumentConverter`` (and the concurrent picture describer).
     3. Convert the document → ``DoclingDocument`` (this is the heavy step:
-       layout analysis, OCR, table detection, VLM calls all happen here).
-    4. Extract images (PNG + JSON metadata) and tables (Markdown).
-    5. Chunk the document and write ``chunks.json``.
+       layout analysis, OCR and table detection happen here).
+    4. Describe pictures with the VLM, many requests in flight at once.
+    5. Extract images (PNG + JSON metadata) and tables (Markdown).
+    6. Chunk the document and write ``chunks.json``.
     """
     args = _build_parser().parse_args(argv)
+    if args.benchmark_chunker:
+        try:
+            raw_input = args.input if args.input else _prompt_for_input(DEFAULT_INPUT)
+            return _benchmark_chunker(_resolve_input(raw_input))
+        except Exception as exc:  # pragma: no cover - CLI guardrail
+            print(f"Error: {exc}", file=sys.stderr)
+            return 1
+    if args.batch:
+        return _run_batch(
+            args.batch,
+            _normalize_vlm_url(args.vlm_url),
+            args.vlm_model,
+            args.workers,
+            args.vlm_concurrency,
+            force=args.force,
+        )
     try:
         raw_input = args.input if args.input else _prompt_for_input(DEFAULT_INPUT)
         input_path = _resolve_input(raw_input)
-        output_dir = _create_output_dir(DEFAULT_OUTPUT_ROOT)
-        images_dir = output_dir / "images"
-        tables_dir = output_dir / "tables"
-        chunks_dir = output_dir / "chunks"
 
-        vlm_url = _normalize_vlm_url(args.vlm_url)
-        converter = _build_converter(vlm_url, args.vlm_model)
-
-        # converter.convert() runs the full Docling pipeline and returns a
-        # ConversionResult.  The .document attribute is the parsed DoclingDocument.
-        print(f"Starting conversion: {input_path}")
-        result = converter.convert(str(input_path))
-        doc = result.document
-
-        print("Extracting picture PNGs...")
-        image_count = _extract_images(doc, images_dir)
+        index = _load_source_index()
+        signature = _pipeline_signature(args.vlm_model)
+        sha256 = _file_sha256(input_path)
+        previous = None if args.force else _previous_output(
+            index, input_path, sha256, signature
+        )
+        if previous is not None:
+            print(f"Unchanged since the last conversion: {input_path}")
+            print(f"Reusing output directory: {previous}")
+            print("(pass --force to convert it again)")
+            return 0
 
-        print("Extracting table Markdown...")
-        table_count = _extract_tables(doc, tables_dir)
+        output_dir = _create_output_dir(DEFAULT_OUTPUT_ROOT)
 
-        print("Running HybridChunker with picture annotations...")
-        chunk_count = _write_chunks(doc, chunks_dir, document_name=input_path.stem)
+        vlm_url = _normalize_vlm_url(args.vlm_url)
+        concurrent = args.vlm_concurrency > 0
+        converter = _build_converter(
+            vlm_url, args.vlm_model, describe_pictures=not concurrent
+        )
+        describer = (
+            _build_describer(vlm_url, args.vlm_model, args.vlm_concurrency)
+            if concurrent
+            else None
+        )
+        counts = _process_document(converter, input_path, output_dir, describer)
+        _record_source(index, input_path, sha256, signature, output_dir)
+        _save_source_index(index)
 
     except Exception as exc:  # pragma: no cover - CLI guardrail
         print(f"Error: {exc}", file=sys.stderr)
         return 1
 
     print("Processing complete.")
-    print(f"Images: {image_count} | Tables: {table_count} | Chunks: {chunk_count}")
+    print(
+        f"Images: {counts['images']} | Tables: {counts['tables']} "
+        f"| Chunks: {counts['chunks']}"
+    )
     print(f"Output directory: {output_dir}")
     return 0
 
@@ -12,14 +12,23 @@ Run with (from the workshop/ folder):
     uv run --no-project --with duckdb workshop--example-answers/docling_part2_answer.py \
         -i output/<TIME_STAMP>/chunks/chunks.json
 
+Several chunks.json files (e.g. from a Part 1 ``--batch`` run) can be passed
+at once.  Loading is incremental: every chunk is keyed by a content hash, so
+re-running only inserts new/changed chunks and deletes chunks that vanished
+from a re-converted document – existing rows (and their Part 3 embeddings)
+are left alone.  Documents are told apart by their source file path
+(relative to the repo), and documents not passed with -i are never touched.
+
 Optional flags:
     --db   PATH   DuckDB file path (default: workshop/output/rag_chunks.duckdb)
     --search TEXT  Search chunks by keyword after insertion
+    --rebuild      Drop and recreate the table instead of syncing
 """
 
 from __future__ import annotations
 
 import argparse
+import hashlib
 import json
 import sys
 from pathlib import Path
@@ -46,6 +55,26 @@ def _load_chunks(json_path: Path) -> list[dict]:
     return data
 
 
+def _chunk_source(chunk: dict) -> str:
+    """Unique id of the chunk's source file.
+
+    Part 1 writes the input path relative to the repo as ``source``;
+    chunks.json files from before that only have ``document_name`` (the
+    file stem).
+    """
+    return chunk.get("source") or chunk["document_name"]
+
+
+def _chunk_hash(chunk: dict) -> str:
+    """Stable content key: same source, section, pages and text → same hash."""
+    payload = json.dumps(
+        [_chunk_source(chunk), chunk["section_title"],
+         chunk["page_numbers"], chunk["text"]],
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
 # ═══════════════════════════════════════════════════════════════════════════
 # TODO 8 (★): Connect to a Persistent DuckDB Database  ✅ ANSWER
 # ═══════════════════════════════════════════════════════════════════════════
@@ -54,7 +83,16 @@ def _load_chunks(json_path: Path) -> list[dict]:
 def _connect_db(db_path: Path) -> duckdb.DuckDBPyConnection:
     # In Day 1 we used duckdb.connect() for an in-memory database.
     # Passing a file path string makes it persistent on disk.
-    return duckdb.connect(str(db_path))
+    conn = duckdb.connect(str(db_path))
+    # Once Part 3 has run, rag_chunks carries an HNSW index; DuckDB can only
+    # modify the table while the extension that owns the index is loaded.
+    has_hnsw = conn.execute(
+        "SELECT count(*) FROM duckdb_indexes() WHERE index_name = 'idx_vec'"
+    ).fetchone()[0]
+    if has_hnsw:
+        conn.execute("INSTALL vss; LOAD vss;")
+        conn.execute("SET hnsw_enable_experimental_persistence = true;")
+    return conn
 
 
 # ═══════════════════════════════════════════════════════════════════════════
@@ -62,15 +100,28 @@ def _connect_db(db_path: Path) -> duckdb.DuckDBPyConnection:
 # ═══════════════════════════════════════════════════════════════════════════
 
 
-def _create_table(conn: duckdb.DuckDBPyConnection) -> None:
+def _create_table(conn: duckdb.DuckDBPyConnection, rebuild: bool = False) -> None:
     # Same conn.execute("CREATE TABLE ...") pattern as Day 1, but with our
     # own schema.  INTEGER[] is a native DuckDB array type that maps directly
     # to Python list[int] – no JSON serialisation needed.
-    # DROP first so re-runs replace data instead of appending duplicates.
-    conn.execute("DROP TABLE IF EXISTS rag_chunks")
+    # The table is kept across runs so _sync_chunks() can apply only the
+    # delta; tables from before chunk_hash/source existed are rebuilt once.
+    columns = {
+        row[0] for row in conn.execute(
+            "SELECT column_name FROM information_schema.columns"
+            " WHERE table_name = 'rag_chunks'"
+        ).fetchall()
+    }
+    if columns and not {"chunk_hash", "source"} <= columns:
+        print("ℹ️  rag_chunks predates content hashes – rebuilding it once.")
+        rebuild = True
+    if rebuild:
+        conn.execute("DROP TABLE IF EXISTS rag_chunks")
     conn.execute("""
-        CREATE TABLE rag_chunks (
+        CREATE TABLE IF NOT EXISTS rag_chunks (
             chunk_id       INTEGER,
+            chunk_hash     VARCHAR,
+            source         VARCHAR,
             document_name  VARCHAR,
             section_title  VARCHAR,
             page_numbers   INTEGER[],
@@ -78,6 +129,14 @@ def _create_table(conn: duckdb.DuckDBPyConnection) -> None:
             created_at     TIMESTAMP DEFAULT current_timestamp
         )
     """)
+    # Small key/value table: chunks_version is bumped whenever rag_chunks
+    # changes, so Part 3 can tell whether its FTS index is still current.
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS rag_meta (
+            key    VARCHAR PRIMARY KEY,
+            value  BIGINT
+        )
+    """)
 
 
 # ═══════════════════════════════════════════════════════════════════════════
@@ -85,25 +144,97 @@ def _create_table(conn: duckdb.DuckDBPyConnection) -> None:
 # ═══════════════════════════════════════════════════════════════════════════
 
 
-def _insert_chunks(conn: duckdb.DuckDBPyConnection, chunks: list[dict]) -> int:
-    # Same for-loop + conn.execute("INSERT INTO … VALUES (?, ?, …)") pattern
-    # as Day 1.  DuckDB automatically converts Python list[int] → INTEGER[].
-    for i, chunk in enumerate(chunks):
-        conn.execute(
-            """INSERT INTO rag_chunks
-                   (chunk_id, document_name, section_title, page_numbers, text)
-               VALUES (?, ?, ?, ?, ?)""",
-            [
-                i,
-                chunk["document_name"],
-                chunk["section_title"],
-                chunk["page_numbers"],
-                chunk["text"],
-            ],
-        )
+def _insert_chunks(
+    conn: duckdb.DuckDBPyConnection, chunks: list[dict], start_id: int = 0,
+) -> int:
+    # Bulk-load in ONE statement instead of one INSERT per chunk: each column
+    # is passed as a single list parameter and unnest() zips the lists back
+    # into rows.  chunk_ids are consecutive from start_id, and DuckDB
+    # converts the nested Python list[list[int]] → INTEGER[] per row.
+    if not chunks:
+        return 0
+    conn.execute(
+        """INSERT INTO rag_chunks
+               (chunk_id, chunk_hash, source, document_name, section_title,
+                page_numbers, text)
+           SELECT unnest($1::INTEGER[]),
+                  unnest($2::VARCHAR[]),
+                  unnest($3::VARCHAR[]),
+                  unnest($4::VARCHAR[]),
+                  unnest($5::VARCHAR[]),
+                  unnest($6::INTEGER[][]),
+                  unnest($7::VARCHAR[])""",
+        [
+            list(range(start_id, start_id + len(chunks))),
+            [_chunk_hash(chunk) for chunk in chunks],
+            [_chunk_source(chunk) for chunk in chunks],
+            [chunk["document_name"] for chunk in chunks],
+            [chunk["section_title"] for chunk in chunks],
+            [chunk["page_numbers"] for chunk in chunks],
+            [chunk["text"] for chunk in chunks],
+        ],
+    )
     return len(chunks)
 
 
+def _sync_chunks(conn: duckdb.DuckDBPyConnection, chunks: list[dict]) -> dict:
+    """Make rag_chunks match `chunks` for every source file they belong to.
+
+    Chunks are compared by _chunk_hash(): new hashes are inserted with fresh
+    chunk_ids (so they are the only rows Part 3 has to embed), hashes that
+    no longer occur in a loaded source are deleted, and everything else
+    is left untouched.  Sources not present in `chunks` are never touched.
+    Returns {"inserted", "deleted", "unchanged"}.
+    """
+    # Identical chunks within one source collapse to a single row.
+    wanted: dict[str, dict] = {}
+    for chunk in chunks:
+        wanted.setdefault(_chunk_hash(chunk), chunk)
+    sources = sorted({_chunk_source(chunk) for chunk in chunks})
+
+    existing = conn.execute(
+        "SELECT chunk_id, chunk_hash FROM rag_chunks"
+        " WHERE source IN (SELECT unnest($1::VARCHAR[]))",
+        [sources],
+    ).fetchall()
+    existing_hashes = {chunk_hash for _chunk_id, chunk_hash in existing}
+    stale_ids = [chunk_id for chunk_id, chunk_hash in existing
+                 if chunk_hash not in wanted]
+
+    new_chunks = [chunk for chunk_hash, chunk in wanted.items()
+                  if chunk_hash not in existing_hashes]
+
+    conn.begin()
+    try:
+        if stale_ids:
+            conn.execute(
+                "DELETE FROM rag_chunks"
+                " WHERE chunk_id IN (SELECT unnest($1::INTEGER[]))",
+                [stale_ids],
+            )
+        # New ids continue after the current maximum, so ids of surviving
+        # rows – and the embeddings attached to them – never change.
+        next_id = conn.execute(
+            "SELECT coalesce(max(chunk_id) + 1, 0) FROM rag_chunks"
+        ).fetchone()[0]
+        inserted = _insert_chunks(conn, new_chunks, start_id=next_id)
+        if stale_ids or new_chunks:
+            conn.execute("""
+                INSERT INTO rag_meta VALUES ('chunks_version', 1)
+                ON CONFLICT (key) DO UPDATE SET value = rag_meta.value + 1
+            """)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+    return {
+        "inserted": inserted,
+        "deleted": len(stale_ids),
+        "unchanged": len(existing) - len(stale_ids),
+    }
+
+
 # ═══════════════════════════════════════════════════════════════════════════
 # TODO 11 (★★): Search Chunks by Keyword  ✅ ANSWER
 # ═══════════════════════════════════════════════════════════════════════════
@@ -164,8 +295,9 @@ def _build_parser() -> argparse.ArgumentParser:
         "-i",
         "--input",
         type=Path,
+        nargs="+",
         required=True,
-        help="Path to chunks.json from Part 1.",
+        help="Path(s) to chunks.json from Part 1.",
     )
     parser.add_argument(
         "--db",
@@ -179,6 +311,11 @@ def _build_parser() -> argparse.ArgumentParser:
         default=None,
         help="Optional: search chunks containing this keyword.",
     )
+    parser.add_argument(
+        "--rebuild",
+        action="store_true",
+        help="Drop and recreate rag_chunks (Part 3 then re-embeds everything).",
+    )
     return parser
 
 
@@ -186,17 +323,23 @@ def main(argv: list[str] | None = None) -> int:
     args = _build_parser().parse_args(argv)
     try:
         # Step 1: Load chunks from Part 1 output
-        chunks = _load_chunks(args.input)
-        print(f"Loaded {len(chunks)} chunks from {args.input}")
+        chunks = []
+        for json_path in args.input:
+            loaded = _load_chunks(json_path)
+            print(f"Loaded {len(loaded)} chunks from {json_path}")
+            chunks.extend(loaded)
 
         # Step 2: Connect to DuckDB
         args.db.parent.mkdir(parents=True, exist_ok=True)
         conn = _connect_db(args.db)
 
-        # Step 3: Create table and insert data
-        _create_table(conn)
-        inserted = _insert_chunks(conn, chunks)
-        print(f"Inserted {inserted} chunks into {args.db}")
+        # Step 3: Create table (if needed) and apply only the changes
+        _create_table(conn, rebuild=args.rebuild)
+        delta = _sync_chunks(conn, chunks)
+        print(
+            f"Inserted {delta['inserted']} | deleted {delta['deleted']} | "
+            f"unchanged {delta['unchanged']} chunks in {args.db}"
+        )
 
         # Step 4: Show summary statistics
         _show_summary(conn)
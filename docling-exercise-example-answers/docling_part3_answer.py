@@ -14,18 +14,28 @@ Run with (from the workshop/ folder)::
 
 Optional flags::
 
-    --db PATH   Path to DuckDB file (default: workshop/output/rag_chunks.duckdb)
+    --db PATH          Path to DuckDB file (default: workshop/output/rag_chunks.duckdb)
+    --batch-size N     Chunks per embedding request (default: 32)
+    --exact            Brute-force vector search; reports HNSW recall against it
+    --embed-cache PATH Persist query embeddings in this DuckDB file
+    --no-stream        Print the answer only once it is complete
 """
 
 from __future__ import annotations
 
 import argparse
 import sys
+import time
+from collections.abc import Iterator
 from pathlib import Path
 
 import duckdb
 import ollama
 
+# embed_cache.py lives at the repo root, shared with the Day 1 notebook.
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from embed_cache import EmbeddingCache
+
 # ---------------------------------------------------------------------------
 # Constants
 # ---------------------------------------------------------------------------
@@ -39,6 +49,13 @@ CHAT_MODEL = "granite4:350m"
 # Reciprocal Rank Fusion constant (standard default).
 RRF_K = 60
 
+# Number of chunk texts sent per ollama.embed() call in _add_embeddings().
+EMBED_BATCH_SIZE = 32
+
+# Query embeddings are cached per (EMBED_MODEL, text) and shared by every
+# search function here and in the advanced_rag paths that import them.
+_embed_cache = EmbeddingCache(EMBED_MODEL)
+
 
 # ---------------------------------------------------------------------------
 # Database connection (same as exercise – no TODO)
@@ -58,11 +75,18 @@ def _connect_db(db_path: Path) -> duckdb.DuckDBPyConnection:
     return conn
 
 
+def _embed(texts: list[str]) -> list[list[float]]:
+    """Embed query texts through the shared cache (one ollama call for misses)."""
+    return _embed_cache.embed(texts)
+
+
 # ═══════════════════════════════════════════════════════════════════════════
 # TODO 12 (★★★): Generate & Store Embeddings  ✅ ANSWER
 # ═══════════════════════════════════════════════════════════════════════════
 
-def _add_embeddings(conn: duckdb.DuckDBPyConnection) -> None:
+def _add_embeddings(
+    conn: duckdb.DuckDBPyConnection, batch_size: int = EMBED_BATCH_SIZE,
+) -> None:
     # --- schema guard (idempotent) ---
     try:
         conn.execute("SELECT embedding FROM rag_chunks LIMIT 1")
@@ -73,37 +97,97 @@ def _add_embeddings(conn: duckdb.DuckDBPyConnection) -> None:
 
     rows = conn.execute(
         "SELECT chunk_id, text FROM rag_chunks WHERE embedding IS NULL"
+        " ORDER BY chunk_id"
     ).fetchall()
 
     if not rows:
         print("✅ All chunks already have embeddings.")
         return
 
-    print(f"🧠 Generating embeddings for {len(rows)} chunks …")
-
-    # Loop through each chunk, call ollama.embed(), and UPDATE the row.
-    # Same pattern as Day 1's embedding loop, but using UPDATE instead of
-    # INSERT because the rows already exist from Part 2.
-    for chunk_id, text in rows:
-        resp = ollama.embed(model=EMBED_MODEL, input=text)
-        vec = resp["embeddings"][0]
-        conn.execute(
-            "UPDATE rag_chunks SET embedding = ? WHERE chunk_id = ?",
-            [vec, chunk_id],
+    print(f"🧠 Generating embeddings for {len(rows)} chunks "
+          f"(batch size {batch_size}) …")
+
+    # ollama.embed() accepts a list of texts, so each batch is ONE HTTP call.
+    # The batch's vectors are then written back in ONE UPDATE … FROM that
+    # joins against a staged (chunk_id, embedding) relation built by
+    # unnest()-ing two list parameters – no per-row UPDATE statements.
+    # Each batch is committed as it lands, so if a call fails part-way the
+    # finished batches are kept and re-running picks up the remaining
+    # `embedding IS NULL` rows.
+    done = 0
+    try:
+        for start in range(0, len(rows), batch_size):
+            batch = rows[start:start + batch_size]
+            ids = [chunk_id for chunk_id, _text in batch]
+            texts = [text for _chunk_id, text in batch]
+
+            vecs = ollama.embed(model=EMBED_MODEL, input=texts)["embeddings"]
+            conn.execute("""
+                UPDATE rag_chunks
+                SET embedding = staged.embedding
+                FROM (
+                    SELECT unnest($1::INTEGER[])      AS chunk_id,
+                           unnest($2::FLOAT[1024][])  AS embedding
+                ) AS staged
+                WHERE rag_chunks.chunk_id = staged.chunk_id
+            """, [ids, vecs])
+
+            done += len(batch)
+            print(f"   … {done}/{len(rows)} chunks embedded", flush=True)
+    except Exception:
+        print(
+            f"\n⚠️  Embedding stopped after {done}/{len(rows)} chunks. "
+            "Re-run to resume from the remaining chunks.",
+            file=sys.stderr,
         )
-        print(".", end="", flush=True)
+        raise
 
-    print(f"\n✅ Embedded {len(rows)} chunks.")
+    print(f"✅ Embedded {len(rows)} chunks.")
 
 
 # ═══════════════════════════════════════════════════════════════════════════
 # TODO 13 (★★): Create Search Indexes  ✅ ANSWER
 # ═══════════════════════════════════════════════════════════════════════════
 
+def _meta_value(conn: duckdb.DuckDBPyConnection, key: str) -> int | None:
+    """Read a value from Part 2's rag_meta table (None if absent)."""
+    try:
+        row = conn.execute(
+            "SELECT value FROM rag_meta WHERE key = ?", [key]
+        ).fetchone()
+    except duckdb.CatalogException:
+        return None
+    return row[0] if row else None
+
+
+def _fts_is_current(conn: duckdb.DuckDBPyConnection) -> bool:
+    """True if the FTS index was built from the current rag_chunks contents."""
+    has_fts = conn.execute(
+        "SELECT count(*) FROM duckdb_schemas()"
+        " WHERE schema_name = 'fts_main_rag_chunks'"
+    ).fetchone()[0]
+    version = _meta_value(conn, "chunks_version")
+    return bool(has_fts) and version is not None and (
+        _meta_value(conn, "fts_version") == version
+    )
+
+
+def _mark_fts_built(conn: duckdb.DuckDBPyConnection) -> None:
+    """Record which chunks_version the FTS index was built from."""
+    version = _meta_value(conn, "chunks_version")
+    if version is None:
+        return  # database from before incremental ingestion
+    conn.execute("""
+        INSERT INTO rag_meta VALUES ('fts_version', ?)
+        ON CONFLICT (key) DO UPDATE SET value = excluded.value
+    """, [version])
+
+
 def _create_indexes(conn: duckdb.DuckDBPyConnection) -> None:
     print("⚡ Creating indexes …")
 
-    # A) HNSW vector index – same as Day 1.
+    # A) HNSW vector index – same as Day 1.  Built once; rows that Part 2
+    #    adds or deletes later are applied to it incrementally.
     conn.execute("""
         CREATE INDEX IF NOT EXISTS idx_vec
             ON rag_chunks USING HNSW (embedding)
@@ -112,9 +196,16 @@ def _create_indexes(conn: duckdb.DuckDBPyConnection) -> None:
 
     # B) Full-Text Search index – new!  DuckDB's FTS extension creates a
     #    schema called fts_main_rag_chunks with a match_bm25() macro.
-    conn.execute(
-        "PRAGMA create_fts_index('rag_chunks', 'chunk_id', 'text', overwrite=1)"
-    )
+    #    Unlike HNSW it is not maintained on INSERT/DELETE and can only be
+    #    rebuilt as a whole, so skip that when rag_chunks has not changed
+    #    since the last build (Part 2 bumps rag_meta.chunks_version).
+    if _fts_is_current(conn):
+        print("   FTS index is up to date.")
+    else:
+        conn.execute(
+            "PRAGMA create_fts_index('rag_chunks', 'chunk_id', 'text', overwrite=1)"
+        )
+        _mark_fts_built(conn)
 
     print("✅ Indexes ready.")
 
@@ -123,35 +214,75 @@ def _create_indexes(conn: duckdb.DuckDBPyConnection) -> None:
 # TODO 14 (★★): Vector Search  ✅ ANSWER
 # ═══════════════════════════════════════════════════════════════════════════
 
+def _vector_literal(query_vec: list[float]) -> str:
+    """Render a query vector as a FLOAT[1024] SQL constant."""
+    # The VSS optimizer only swaps in the HNSW index when the query vector is
+    # a constant in the plan – a ?-parameter is still unknown at planning time.
+    return "[" + ", ".join(repr(float(x)) for x in query_vec) + "]::FLOAT[1024]"
+
+
+def _vector_search_sql(query_vec: list[float], limit: int, exact: bool) -> str:
+    """Build the vector search query; score is always cosine similarity."""
+    vec = _vector_literal(query_vec)
+    if exact:
+        # Brute force: similarity DESC is not a pattern HNSW can serve, so
+        # every row is scored.  Used as the ground truth for recall checks.
+        return f"""
+            SELECT chunk_id,
+                   array_cosine_similarity(embedding, {vec}) AS score
+            FROM rag_chunks
+            ORDER BY score DESC
+            LIMIT {int(limit)}
+        """
+    # HNSW: the index (metric = 'cosine') serves exactly
+    #   ORDER BY array_cosine_distance(col, <constant>) LIMIT n
+    # so rank by distance ASC and convert back to similarity outside it.
+    return f"""
+        SELECT chunk_id, 1 - distance AS score
+        FROM (
+            SELECT chunk_id,
+                   array_cosine_distance(embedding, {vec}) AS distance
+            FROM rag_chunks
+            ORDER BY distance
+            LIMIT {int(limit)}
+        )
+        ORDER BY distance
+    """
+
+
 def _search_vector(
     conn: duckdb.DuckDBPyConnection,
     query_vec: list[float],
     limit: int = 10,
+    exact: bool = False,
 ) -> list[tuple[int, float]]:
     """Return [(chunk_id, cosine_score), …] sorted by score descending."""
-    # Same array_cosine_similarity() pattern as Day 1's search_vector().
-    return conn.execute("""
-        SELECT chunk_id,
-               array_cosine_similarity(embedding, ?::FLOAT[1024]) AS score
-        FROM rag_chunks
-        ORDER BY score DESC
-        LIMIT ?
-    """, [query_vec, limit]).fetchall()
+    return conn.execute(_vector_search_sql(query_vec, limit, exact)).fetchall()
+
+
+def _check_vector_plan(conn: duckdb.DuckDBPyConnection) -> None:
+    """Fail loudly if vector search would not use the idx_vec HNSW index."""
+    probe = [0.0] * 1023 + [1.0]
+    plan = conn.execute(
+        "EXPLAIN " + _vector_search_sql(probe, limit=10, exact=False)
+    ).fetchall()
+    plan_text = "\n".join(str(row[-1]) for row in plan)
+    if "HNSW_INDEX_SCAN" not in plan_text:
+        raise RuntimeError(
+            "Vector search plan does not use the HNSW index "
+            "(fell back to a sequential scan):\n" + plan_text
+        )
 
 
 # ═══════════════════════════════════════════════════════════════════════════
 # TODO 15 (★★): BM25 Search  ✅ ANSWER
 # ═══════════════════════════════════════════════════════════════════════════
 
-def _search_bm25(
-    conn: duckdb.DuckDBPyConnection,
-    query: str,
-    limit: int = 10,
-) -> list[tuple[int, float]]:
-    """Return [(chunk_id, bm25_score), …] sorted by score descending."""
+def _bm25_search_sql(limit: int) -> str:
+    """Build the BM25 query; the query text is its single ``?`` parameter."""
     # DuckDB FTS creates a macro fts_main_rag_chunks.match_bm25() that
     # scores each row.  Rows with no keyword match get NULL → filter them.
-    return conn.execute("""
+    return f"""
         SELECT chunk_id, score
         FROM (
             SELECT *, fts_main_rag_chunks.match_bm25(chunk_id, ?) AS score
@@ -159,67 +290,144 @@ def _search_bm25(
         )
         WHERE score IS NOT NULL
         ORDER BY score DESC
-        LIMIT ?
-    """, [query, limit]).fetchall()
+        LIMIT {int(limit)}
+    """
 
 
-# ═══════════════════════════════════════════════════════════════════════════
-# TODO 16 (★★★): Reciprocal Rank Fusion (RRF)  ✅ ANSWER
-# ═══════════════════════════════════════════════════════════════════════════
+def _search_bm25(
+    conn: duckdb.DuckDBPyConnection,
+    query: str,
+    limit: int = 10,
+) -> list[tuple[int, float]]:
+    """Return [(chunk_id, bm25_score), …] sorted by score descending."""
+    return conn.execute(_bm25_search_sql(limit), [query]).fetchall()
 
-def _hybrid_search(
-    conn: duckdb.DuckDBPyConnection, query: str, top_k: int = 5,
-) -> list[dict]:
-    """Run vector + BM25 search, fuse with RRF, return top_k results."""
-    print(f"\n🔍 Searching: '{query}'")
 
-    # Embed the query once (reused by vector search)
-    query_vec = ollama.embed(model=EMBED_MODEL, input=query)["embeddings"][0]
+def _fetch_texts(
+    conn: duckdb.DuckDBPyConnection, chunk_ids: list[int],
+) -> dict[int, str]:
+    """Return {chunk_id: text} for all chunk_ids in a single query."""
+    # One IN-list lookup instead of a SELECT per result; callers keep their
+    # own rank order by iterating their ranked ids against this dict.
+    if not chunk_ids:
+        return {}
+    return dict(conn.execute(
+        "SELECT chunk_id, text FROM rag_chunks"
+        " WHERE chunk_id IN (SELECT unnest($1::INTEGER[]))",
+        [list(chunk_ids)],
+    ).fetchall())
 
-    # Retrieve more candidates than top_k so RRF has room to re-rank.
-    vec_results = _search_vector(conn, query_vec, limit=top_k * 2)
-    bm25_results = _search_bm25(conn, query, limit=top_k * 2)
 
-    # RRF: for each ranked list, accumulate 1/(k + rank) per chunk_id.
-    # Chunks that appear in BOTH lists get a higher fused score.
-    fused_scores: dict[int, float] = {}
+# ═══════════════════════════════════════════════════════════════════════════
+# TODO 16 (★★★): Reciprocal Rank Fusion (RRF)  ✅ ANSWER
+# ═══════════════════════════════════════════════════════════════════════════
 
-    for i, (chunk_id, _score) in enumerate(vec_results):
-        rank = i + 1
-        fused_scores[chunk_id] = (
-            fused_scores.get(chunk_id, 0.0) + 1.0 / (RRF_K + rank)
+def _fused_search_sql(
+    vec_sqls: list[str], n_texts: int, limit: int, top_k: int,
+) -> str:
+    """Build the single-statement RRF query over all candidate lists."""
+    # One CTE per ranked list: ROW_NUMBER() turns each score order into a
+    # 1-based rank.  Equal scores are broken by chunk_id so the ranks (and
+    # the fused order) are the same on every run.
+    ctes = []
+    for i, sql in enumerate(vec_sqls):
+        ctes.append(f"""vec_{i} AS (
+            SELECT chunk_id, ROW_NUMBER() OVER (ORDER BY score DESC, chunk_id) AS rank
+            FROM ({sql})
+        )""")
+    for i in range(n_texts):
+        ctes.append(f"""bm25_{i} AS (
+            SELECT chunk_id, ROW_NUMBER() OVER (ORDER BY score DESC, chunk_id) AS rank
+            FROM ({_bm25_search_sql(limit)})
+        )""")
+
+    def _side(prefix: str, n: int) -> str:
+        # Per side, sum 1/(k + rank) over every query's list; the reported
+        # rank is the best one any query gave the chunk.
+        union = " UNION ALL ".join(
+            f"SELECT chunk_id, rank FROM {prefix}_{i}" for i in range(n)
+        ) or "SELECT NULL::INTEGER AS chunk_id, NULL::BIGINT AS rank WHERE false"
+        return f"""{prefix} AS (
+            SELECT chunk_id,
+                   SUM(1.0 / ({RRF_K} + rank)) AS rrf,
+                   MIN(rank) AS rank
+            FROM ({union})
+            GROUP BY chunk_id
+        )"""
+
+    ctes += [_side("vec", len(vec_sqls)), _side("bm25", n_texts)]
+    return f"""
+        WITH {", ".join(ctes)},
+        fused AS (
+            SELECT COALESCE(v.chunk_id, b.chunk_id) AS chunk_id,
+                   COALESCE(v.rrf, 0) + COALESCE(b.rrf, 0) AS rrf_score,
+                   v.rank AS vec_rank,
+                   b.rank AS bm25_rank
+            FROM vec v
+            FULL OUTER JOIN bm25 b ON v.chunk_id = b.chunk_id
         )
+        SELECT f.chunk_id, r.text, f.rrf_score, f.vec_rank, f.bm25_rank
+        FROM fused f
+        JOIN rag_chunks r ON r.chunk_id = f.chunk_id
+        ORDER BY f.rrf_score DESC, f.vec_rank NULLS LAST, f.bm25_rank, f.chunk_id
+        LIMIT {int(top_k)}
+    """
 
-    for i, (chunk_id, _score) in enumerate(bm25_results):
-        rank = i + 1
-        fused_scores[chunk_id] = (
-            fused_scores.get(chunk_id, 0.0) + 1.0 / (RRF_K + rank)
-        )
 
-    # Sort by fused score descending, take top_k
-    sorted_ids = sorted(fused_scores.items(), key=lambda x: x[1], reverse=True)[
-        :top_k
+def _fused_search(
+    conn: duckdb.DuckDBPyConnection,
+    query_vecs: list[list[float]],
+    queries: list[str],
+    top_k: int = 5,
+    limit: int | None = None,
+    exact: bool = False,
+) -> list[dict]:
+    """Vector + BM25 search and RRF fusion in ONE SQL round-trip.
+
+    Every vector in `query_vecs` and every text in `queries` contributes a
+    ranked list of `limit` candidates (default ``top_k * 2``); pass several
+    of each for multi-query fusion.  Returns dicts with chunk_id, text,
+    rrf_score, vec_rank and bm25_rank (a rank is None if that side missed).
+    """
+    limit = top_k * 2 if limit is None else limit
+    # Each vector subquery keeps the HNSW-friendly shape of _search_vector().
+    vec_sqls = [_vector_search_sql(v, limit, exact) for v in query_vecs]
+    sql = _fused_search_sql(vec_sqls, len(queries), limit, top_k)
+    rows = conn.execute(sql, list(queries)).fetchall()
+    return [
+        {"chunk_id": chunk_id, "text": text, "rrf_score": float(score),
+         "vec_rank": vec_rank, "bm25_rank": bm25_rank}
+        for chunk_id, text, score, vec_rank, bm25_rank in rows
     ]
 
-    # Fetch the actual text for the top chunks
-    results = []
-    for chunk_id, score in sorted_ids:
-        row = conn.execute(
-            "SELECT chunk_id, text FROM rag_chunks WHERE chunk_id = ?",
-            [chunk_id],
-        ).fetchone()
-        results.append({"chunk_id": row[0], "text": row[1], "rrf_score": score})
 
-    return results
+def _hybrid_search(
+    conn: duckdb.DuckDBPyConnection, query: str, top_k: int = 5,
+    exact: bool = False,
+) -> list[dict]:
+    """Run vector + BM25 search, fuse with RRF, return top_k results."""
+    print(f"\n🔍 Searching: '{query}'")
+
+    # Embed the query once (cached across calls), then let DuckDB retrieve
+    # top_k * 2 candidates per side, rank them with ROW_NUMBER(), fuse with
+    # RRF and join the texts – all in a single statement.  Chunks that
+    # appear in BOTH lists get a higher fused score.
+    query_vec = _embed([query])[0]
+    return _fused_search(conn, [query_vec], [query], top_k=top_k, exact=exact)
 
 
 # ═══════════════════════════════════════════════════════════════════════════
 # TODO 17 (★): Generate a RAG Answer  ✅ ANSWER
 # ═══════════════════════════════════════════════════════════════════════════
 
-def _generate_answer(query: str, chunks: list[dict]) -> None:
-    print("\n🤖 Generating answer …")
+def _stream_answer(
+    query: str, chunks: list[dict], stats: dict | None = None,
+) -> Iterator[str]:
+    """Yield answer tokens as Ollama produces them.
 
+    If `stats` is given it is filled with ``ttft`` (seconds until the first
+    token), ``tokens`` and ``tokens_per_sec`` once the stream finishes.
+    """
     # Build context from retrieved chunks
     context = "\n\n---\n\n".join(c["text"] for c in chunks)
 
@@ -233,11 +441,64 @@ Question: {query}
 
 Answer:"""
 
-    resp = ollama.chat(
+    t0 = time.perf_counter()
+    ttft = None
+    pieces = 0
+    final: dict = {}
+    for part in ollama.chat(
         model=CHAT_MODEL,
         messages=[{"role": "user", "content": prompt}],
-    )
-    print(resp["message"]["content"])
+        stream=True,
+    ):
+        token = part["message"]["content"]
+        if token:
+            if ttft is None:
+                ttft = time.perf_counter() - t0
+            pieces += 1
+            yield token
+        if part.get("done"):
+            final = part
+
+    if stats is not None:
+        elapsed = time.perf_counter() - t0
+        # Prefer Ollama's own counters from the final chunk when present.
+        tokens = final.get("eval_count") or pieces
+        gen_secs = (final.get("eval_duration") or 0) / 1e9 or (elapsed - (ttft or 0))
+        stats.update(
+            ttft=ttft if ttft is not None else elapsed,
+            tokens=tokens,
+            tokens_per_sec=tokens / gen_secs if gen_secs > 0 else 0.0,
+        )
+
+
+def _generate_answer(query: str, chunks: list[dict], stream: bool = True) -> str:
+    print("\n🤖 Generating answer …")
+
+    if stream:
+        # Print tokens as they arrive – perceived latency is time-to-first-token.
+        stats: dict = {}
+        parts = []
+        for token in _stream_answer(query, chunks, stats):
+            print(token, end="", flush=True)
+            parts.append(token)
+        print(f"\n\n⏱️  TTFT {stats['ttft']:.2f}s | "
+              f"{stats['tokens']} tokens @ {stats['tokens_per_sec']:.1f} tok/s")
+        return "".join(parts)
+
+    answer = "".join(_stream_answer(query, chunks))
+    print(answer)
+    return answer
+
+
+def _report_recall(
+    conn: duckdb.DuckDBPyConnection, query: str, limit: int = 10,
+) -> None:
+    """Print recall@limit of the HNSW vector search against brute force."""
+    query_vec = _embed([query])[0]
+    approx = {cid for cid, _ in _search_vector(conn, query_vec, limit)}
+    exact = {cid for cid, _ in _search_vector(conn, query_vec, limit, exact=True)}
+    recall = len(approx & exact) / len(exact) if exact else 1.0
+    print(f"\n📏 HNSW recall@{limit} vs brute force: {recall:.2f}")
 
 
 # ═══════════════════════════════════════════════════════════════════════════
@@ -260,20 +521,47 @@ def main() -> int:
         required=True,
         help="Question to search for and answer.",
     )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=EMBED_BATCH_SIZE,
+        help=f"Chunks per ollama.embed() call (default: {EMBED_BATCH_SIZE}).",
+    )
+    parser.add_argument(
+        "--exact",
+        action="store_true",
+        help="Use brute-force vector search and report HNSW recall against it.",
+    )
+    parser.add_argument(
+        "--embed-cache",
+        type=Path,
+        default=None,
+        help="Optional DuckDB file for persisting query embeddings across runs.",
+    )
+    parser.add_argument(
+        "--no-stream",
+        action="store_true",
+        help="Wait for the full answer instead of streaming tokens.",
+    )
     args = parser.parse_args()
 
     try:
         # 1. Connect & load extensions
         conn = _connect_db(args.db)
+        if args.embed_cache:
+            _embed_cache.attach(args.embed_cache)
 
         # 2. Enrich: add embeddings to existing chunks
-        _add_embeddings(conn)
+        _add_embeddings(conn, batch_size=args.batch_size)
 
         # 3. Index: create HNSW + FTS indexes
         _create_indexes(conn)
+        _check_vector_plan(conn)
 
         # 4. Search: hybrid BM25 + vector → RRF fusion
-        results = _hybrid_search(conn, args.query)
+        if args.exact:
+            _report_recall(conn, args.query)
+        results = _hybrid_search(conn, args.query, exact=args.exact)
 
         print("\n--- Top Retrieved Chunks ---")
         for r in results:
@@ -282,7 +570,7 @@ def main() -> int:
             print(f"  [{score:.4f}] {snippet} …")
 
         # 5. Answer: feed context to LLM
-        _generate_answer(args.query, results)
+        _generate_answer(args.query, results, stream=not args.no_stream)
 
         conn.close()
         return 0
@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+Picture Describer - Concurrent VLM captions for Part 1's pictures.
+
+Docling's built-in picture-description stage sends one picture at a time to
+the VLM and waits for the answer (up to 90 s) before sending the next.
+``PictureDescriber`` is the same step as a separate stage that runs after
+conversion:
+
+  • many pictures in flight at once (bounded by ``max_in_flight``) over one
+    pooled ``requests.Session``, with retries on 429/5xx;
+  • a content-addressed cache: the key is SHA-256 of the model, the prompt
+    and the picture's PNG bytes, so an unchanged picture is never described
+    twice.  With ``cache_dir`` every description is also stored as
+    ``<key>.txt`` – one file per entry, so several worker processes (Part 1
+    ``--batch``) can share the directory safely.
+
+Usage:
+    from picture_describer import PictureDescriber
+
+    describer = PictureDescriber(VLM_URL, "qwen3-vl-8b", PROMPT,
+                                 max_in_flight=8, cache_dir="output/picture_cache")
+    texts = describer.describe_many([png_bytes_1, png_bytes_2])  # None on failure
+    print(describer.stats())   # {'hits': ..., 'misses': ..., 'failures': ..., ...}
+
+Local stand-in server (OpenAI-compatible ``/v1/chat/completions``; replies
+with the image size and a hash prefix) for running Part 1 without the GPU:
+    python docling-exercise-example-answers/picture_describer.py serve --port 8766
+    # then pass --vlm-url http://127.0.0.1:8766 to docling_part1_answer.py
+
+Tests (run against the stand-in server):
+    uv run pytest tests/test_picture_describer.py
+"""
+
+from __future__ import annotations
+
+import argparse
+import base64
+import hashlib
+import json
+import os
+import struct
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+class PictureDescriber:
+    """Describe PNG pictures with an OpenAI-compatible VLM, concurrently and cached."""
+
+    def __init__(
+        self,
+        url: str,
+        model: str,
+        prompt: str,
+        *,
+        timeout: float = 90.0,
+        max_in_flight: int = 8,
+        max_tokens: int = 200,
+        max_retries: int = 2,
+        cache_dir: str | Path | None = None,
+    ) -> None:
+        self.url = url
+        self.model = model
+        self.prompt = prompt
+        self.timeout = timeout
+        self.max_in_flight = max(1, max_in_flight)
+        self.max_tokens = max_tokens
+        self.hits = 0
+        self.misses = 0
+        self.failures = 0
+        self._cache: dict[str, str] = {}
+        self._lock = threading.Lock()
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else None
+        if self.cache_dir is not None:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+        retry = Retry(
+            total=max_retries,
+            backoff_factor=0.5,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=frozenset({"POST"}),
+        )
+        adapter = HTTPAdapter(
+            pool_connections=1, pool_maxsize=self.max_in_flight, max_retries=retry,
+        )
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def key(self, png: bytes) -> str:
+        """Cache key for one picture under this model and prompt."""
+        h = hashlib.sha256(f"{self.model}\0{self.prompt}\0".encode("utf-8"))
+        h.update(png)
+        return h.hexdigest()
+
+    def describe_many(self, pictures: list[bytes]) -> list[str | None]:
+        """Return one description per PNG (None where the VLM call failed).
+
+        Cache misses are sent concurrently, at most ``max_in_flight`` at a
+        time; identical pictures are only sent once.
+        """
+        keys = [self.key(png) for png in pictures]
+        found = self._lookup(keys)
+
+        todo: dict[str, bytes] = {}
+        for k, png in zip(keys, pictures):
+            if k not in found:
+                todo.setdefault(k, png)
+
+        if todo:
+            with ThreadPoolExecutor(max_workers=min(self.max_in_flight, len(todo))) as pool:
+                texts = list(pool.map(self._describe_one, todo.values()))
+            fresh = {k: text for k, text in zip(todo, texts) if text is not None}
+            self._store(fresh)
+            found.update(fresh)
+
+        with self._lock:
+            self.hits += len(pictures) - len(todo)
+            self.misses += len(todo)
+            self.failures += sum(k not in found for k in todo)
+        return [found.get(k) for k in keys]
+
+    def stats(self) -> dict:
+        """Hit/miss/failure counters and current cache size."""
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses,
+                    "failures": self.failures, "entries": len(self._cache)}
+
+    def close(self) -> None:
+        self.session.close()
+
+    # ── internals ──────────────────────────────────────────────────────────
+
+    def _lookup(self, keys: list[str]) -> dict[str, str]:
+        found: dict[str, str] = {}
+        with self._lock:
+            for k in keys:
+                if k in self._cache:
+                    found[k] = self._cache[k]
+                elif self.cache_dir is not None:
+                    path = self.cache_dir / f"{k}.txt"
+                    if path.exists():
+                        found[k] = self._cache[k] = path.read_text(encoding="utf-8")
+        return found
+
+    def _store(self, fresh: dict[str, str]) -> None:
+        with self._lock:
+            self._cache.update(fresh)
+        if self.cache_dir is None:
+            return
+        for k, text in fresh.items():
+            # Write-then-rename: a reader never sees a half-written entry,
+            # even when another process stores the same key concurrently.
+            tmp = self.cache_dir / f"{k}.{os.getpid()}.{threading.get_ident()}.tmp"
+            tmp.write_text(text, encoding="utf-8")
+            os.replace(tmp, self.cache_dir / f"{k}.txt")
+
+    def _describe_one(self, png: bytes) -> str | None:
+        image_url = "data:image/png;base64," + base64.b64encode(png).decode("ascii")
+        try:
+            resp = self.session.post(self.url, json={
+                "model": self.model,
+                "max_completion_tokens": self.max_tokens,
+                "messages": [{
+                    "role": "user",
+                    "content": [
+                        {"type": "image_url", "image_url": {"url": image_url}},
+                        {"type": "text", "text": self.prompt},
+                    ],
+                }],
+            }, timeout=self.timeout)
+            resp.raise_for_status()
+            return resp.json()["choices"][0]["message"]["content"].strip()
+        except (requests.RequestException, KeyError, IndexError, ValueError) as exc:
+            print(f"Picture description failed: {exc}", file=sys.stderr)
+            return None
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# Local stand-in server
+# ═══════════════════════════════════════════════════════════════════════════
+
+def _png_size(png: bytes) -> tuple[int, int] | None:
+    """Width and height from a PNG's IHDR chunk."""
+    if png[:8] != b"\x89PNG\r\n\x1a\n" or len(png) < 24:
+        return None
+    return struct.unpack(">II", png[16:24])
+
+
+class _StubVlmHandler(BaseHTTPRequestHandler):
+    """Minimal ``POST /v1/chat/completions`` that "describes" the first image."""
+
+    # Seconds to sleep per request – lets you see the effect of concurrency.
+    delay = 0.0
+
+    def do_POST(self) -> None:  # noqa: N802 – http.server naming
+        if self.path.rstrip("/") != "/v1/chat/completions":
+            self.send_error(404)
+            return
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        png = b""
+        for message in body.get("messages", []):
+            content = message.get("content")
+            if isinstance(content, list):
+                for part in content:
+                    if part.get("type") == "image_url":
+                        url = part["image_url"]["url"]
+                        png = base64.b64decode(url.split(",", 1)[-1])
+                        break
+        if self.delay:
+            time.sleep(self.delay)
+
+        size = _png_size(png)
+        shape = f"{size[0]}x{size[1]}" if size else "unknown-size"
+        text = (f"A {shape} picture (stand-in description "
+                f"{hashlib.sha256(png).hexdigest()[:8]}).")
+        payload = json.dumps({
+            "id": "stub",
+            "object": "chat.completion",
+            "model": body.get("model"),
+            "choices": [{"index": 0, "finish_reason": "stop",
+                         "message": {"role": "assistant", "content": text}}],
+        }).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format: str, *args: object) -> None:
+        pass
+
+
+def serve_stub(host: str = "127.0.0.1", port: int = 0,
+               delay: float = 0.0) -> ThreadingHTTPServer:
+    """Start the stand-in VLM in a background thread and return it.
+
+    ``port=0`` picks a free port; read it back from ``server.server_port``.
+    Call ``server.shutdown()`` when done.
+    """
+    handler = type("_Handler", (_StubVlmHandler,), {"delay": delay})
+    server = ThreadingHTTPServer((host, port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Picture describer tools")
+    commands = parser.add_subparsers(dest="command", required=True)
+    serve = commands.add_parser(
+        "serve", help="Run the local stand-in OpenAI-compatible VLM server.")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=8766)
+    serve.add_argument("--delay", type=float, default=0.0,
+                       help="Seconds to sleep per request (simulates VLM latency).")
+    args = parser.parse_args()
+
+    handler = type("_Handler", (_StubVlmHandler,), {"delay": args.delay})
+    server = ThreadingHTTPServer((args.host, args.port), handler)
+    print(f"Stand-in VLM on http://{args.host}:{args.port}/v1/chat/completions")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
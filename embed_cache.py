@@ -0,0 +1,139 @@
+"""
+Embedding Cache - Reuse query embeddings instead of calling ollama.embed() again.
+
+Cache keys are based on: embedding model + SHA-256 of the exact text.
+The same text embedded by a different model is never mixed up.
+
+Two layers:
+  • In-memory LRU (bounded by max_entries) – shared by every caller in the
+    process, so Multi-Query / CRAG retries / Self-RAG rounds hit it.
+  • Optional on-disk DuckDB store – survives between runs.
+
+Usage:
+    from embed_cache import EmbeddingCache
+
+    cache = EmbeddingCache("qwen3-embedding:0.6b")
+    cache.attach("output/embed_cache.duckdb")      # optional persistence
+    vec = cache.embed(["How does attention work?"])[0]
+
+    print(cache.stats())   # {'hits': ..., 'misses': ..., 'entries': ...}
+"""
+
+from __future__ import annotations
+
+import hashlib
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+import duckdb
+import ollama
+
+
+class EmbeddingCache:
+    """Content-addressed embedding cache with LRU eviction and disk backing."""
+
+    def __init__(self, model: str, max_entries: int = 4096) -> None:
+        self.model = model
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._memory: OrderedDict[str, list[float]] = OrderedDict()
+        self._disk: duckdb.DuckDBPyConnection | None = None
+        # One lock guards the LRU and the disk connection; the ollama call
+        # itself runs outside it so threads can embed concurrently.
+        self._lock = threading.Lock()
+
+    def key(self, text: str) -> str:
+        """Cache key for `text` under this cache's model."""
+        return hashlib.sha256(f"{self.model}\0{text}".encode("utf-8")).hexdigest()
+
+    def attach(self, db_path: str | Path) -> None:
+        """Back the cache with a DuckDB file (created if missing)."""
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        conn = duckdb.connect(str(db_path))
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS query_embeddings (
+                key        VARCHAR PRIMARY KEY,
+                model      VARCHAR,
+                embedding  FLOAT[]
+            )
+        """)
+        with self._lock:
+            self._disk = conn
+
+    def close(self) -> None:
+        """Close the on-disk store (the in-memory layer is kept)."""
+        with self._lock:
+            if self._disk is not None:
+                self._disk.close()
+                self._disk = None
+
+    def embed(self, texts: list[str]) -> list[list[float]]:
+        """Return one embedding per text, calling ollama.embed() only for misses.
+
+        All misses are sent in a single batched ollama.embed() call.
+        """
+        keys = [self.key(t) for t in texts]
+        found = self._lookup(keys)
+
+        missing = [i for i, k in enumerate(keys) if k not in found]
+        if missing:
+            # Deduplicate so a repeated text is only embedded once.
+            todo: dict[str, str] = {}
+            for i in missing:
+                todo.setdefault(keys[i], texts[i])
+            vecs = ollama.embed(model=self.model, input=list(todo.values()))["embeddings"]
+            fresh = dict(zip(todo.keys(), (list(v) for v in vecs)))
+            self._store(fresh)
+            found.update(fresh)
+
+        with self._lock:
+            self.hits += len(texts) - len(missing)
+            self.misses += len(missing)
+        return [found[k] for k in keys]
+
+    def stats(self) -> dict:
+        """Hit/miss counters and current in-memory size."""
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses,
+                    "entries": len(self._memory)}
+
+    # ── internals ──────────────────────────────────────────────────────────
+
+    def _lookup(self, keys: list[str]) -> dict[str, list[float]]:
+        found: dict[str, list[float]] = {}
+        with self._lock:
+            for k in keys:
+                if k in self._memory:
+                    self._memory.move_to_end(k)
+                    found[k] = self._memory[k]
+
+            cold = [k for k in dict.fromkeys(keys) if k not in found]
+            if cold and self._disk is not None:
+                rows = self._disk.execute(
+                    "SELECT key, embedding FROM query_embeddings"
+                    " WHERE key IN (SELECT unnest($1::VARCHAR[]))",
+                    [cold],
+                ).fetchall()
+                for k, vec in rows:
+                    found[k] = list(vec)
+                    self._remember(k, found[k])
+        return found
+
+    def _store(self, fresh: dict[str, list[float]]) -> None:
+        with self._lock:
+            for k, vec in fresh.items():
+                self._remember(k, vec)
+            if self._disk is not None and fresh:
+                self._disk.execute("""
+                    INSERT OR REPLACE INTO query_embeddings
+                    SELECT unnest($1::VARCHAR[]), $2, unnest($3::FLOAT[][])
+                """, [list(fresh.keys()), self.model, list(fresh.values())])
+
+    def _remember(self, key: str, vec: list[float]) -> None:
+        # Caller holds self._lock.
+        self._memory[key] = vec
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
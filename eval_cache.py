@@ -1,8 +1,18 @@
 """
 Evaluation Cache - Save and load DeepEval results to avoid re-running expensive evaluations.
 
-Cache keys are based on: corpus_name + judge_model + search_method
-This ensures results from different judges or corpora are never mixed.
+Two levels:
+  • Whole runs - one JSON file per corpus_name + judge_model + search_method,
+    so results from different judges or corpora are never mixed.  With a
+    `fingerprint` (eval_fingerprint() of the corpus contents, test questions,
+    retrieval config and generator model) the fingerprint is part of the file
+    name, so a changed input is a cache miss - one os.path.exists(), no
+    reading of stale numbers.
+  • Single test cases - one SQLite file (.eval_cache/eval_cases.sqlite) with
+    a score per hash of (question, retrieval_context, actual_output, metric,
+    judge model), plus generated answers per hash of (question, context,
+    generator model).  A re-run only judges cases that are new or changed
+    and recomputes the averages from the cached pieces.
 
 Usage:
     from workshop.eval_cache import save_eval_results, load_eval_results
@@ -15,19 +25,48 @@ Usage:
         avg_scores = run_evaluation(search_keyword, "Keyword Search")
         save_eval_results("s17", "modal/qwen3-vl-8b", "Keyword Search", avg_scores, per_case)
 
+    # Content-addressed: only reused while corpus/questions/config are unchanged
+    fp = eval_fingerprint(documents, test_questions, {"top_k": 3}, "granite4:350m")
+    cached = load_eval_results("s17", "modal/qwen3-vl-8b", "Keyword Search", fp)
+    save_eval_results("s17", "modal/qwen3-vl-8b", "Keyword Search",
+                      avg_scores, per_case, fingerprint=fp)
+
     # Clear all cache
     clear_eval_cache()
 
     # Clear cache for specific corpus/judge combo
     clear_eval_cache(corpus_name="s17", judge_model="modal/qwen3-vl-8b")
+
+    # Per-test-case scores (used by eval_runner.run_eval)
+    key = case_key(question, retrieval_context, actual_output, "Answer Relevancy", judge)
+    scores = load_case_scores([key])          # {key: score} for the hits
+    save_case_scores("s17", judge, "Keyword Search", {key: ("Answer Relevancy", 0.8)})
+
+Writes are safe with many processes sharing .eval_cache: each JSON file is
+written to a temp file and renamed into place (readers see the old or the
+new file, never half of one), under an exclusive lock on .eval_cache/.lock.
+Stress test with N concurrent writers and a reader checking every file:
+    python eval_cache.py stress --writers 16 --rounds 50
 """
 
+import argparse
+import contextlib
+import hashlib
 import json
 import os
 import re
+import sqlite3
+import sys
+import tempfile
 import time
 
+try:
+    import fcntl
+except ImportError:  # Windows: no flock, but os.replace() still keeps files whole
+    fcntl = None
+
 CACHE_DIR = os.path.join(os.path.dirname(__file__), ".eval_cache")
+CASE_DB_PATH = os.path.join(CACHE_DIR, "eval_cases.sqlite")
 
 
 def _sanitize(name: str) -> str:
@@ -35,18 +74,68 @@ def _sanitize(name: str) -> str:
     return re.sub(r'[^a-zA-Z0-9_-]', '_', name.strip().lower())
 
 
-def _cache_path(corpus_name: str, judge_model: str, method: str) -> str:
+@contextlib.contextmanager
+def _locked():
+    """Exclusive lock on the cache directory, shared by all processes."""
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    with open(os.path.join(CACHE_DIR, ".lock"), "a") as lock:
+        if fcntl is not None:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def _atomic_write_json(path: str, data: dict) -> None:
+    """Write JSON to a temp file in the same directory, then rename over `path`."""
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(data, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(tmp)
+        raise
+
+
+def _cache_key(corpus_name: str, judge_model: str, method: str) -> str:
+    return f"{_sanitize(corpus_name)}__{_sanitize(judge_model)}__{_sanitize(method)}"
+
+
+def _cache_path(
+    corpus_name: str, judge_model: str, method: str, fingerprint: str | None = None
+) -> str:
     """Build the cache file path for a specific evaluation run."""
-    key = f"{_sanitize(corpus_name)}__{_sanitize(judge_model)}__{_sanitize(method)}"
+    key = _cache_key(corpus_name, judge_model, method)
+    # "." never appears in a sanitized name, so it cleanly separates the fingerprint
+    if fingerprint:
+        key = f"{key}.{_sanitize(fingerprint)}"
     return os.path.join(CACHE_DIR, f"{key}.json")
 
 
+def eval_fingerprint(*parts) -> str:
+    """
+    Short content hash of everything an evaluation result depends on.
+
+    Pass anything JSON-serializable: document lists, test questions, config
+    dicts, model names - or fingerprints of those, to avoid re-hashing a
+    large corpus on every lookup.
+    """
+    return _hash(*parts)[:16]
+
+
 def save_eval_results(
     corpus_name: str,
     judge_model: str,
     method: str,
     avg_scores: dict,
     per_case: list[dict] | None = None,
+    fingerprint: str | None = None,
 ) -> str:
     """
     Save evaluation results to cache.
@@ -57,40 +146,69 @@ def save_eval_results(
         method: e.g. "Keyword Search", "BM25 Search", "Vector Search"
         avg_scores: dict of metric_name -> average score
         per_case: optional list of per-test-case dicts with detailed results
+        fingerprint: optional eval_fingerprint() of the run's inputs; results
+            saved under older fingerprints for the same run are removed.
 
     Returns:
         Path to the saved cache file.
     """
     os.makedirs(CACHE_DIR, exist_ok=True)
-    path = _cache_path(corpus_name, judge_model, method)
+    path = _cache_path(corpus_name, judge_model, method, fingerprint)
     data = {
         "corpus_name": corpus_name,
         "judge_model": judge_model,
         "method": method,
+        "fingerprint": fingerprint,
         "avg_scores": avg_scores,
         "per_case": per_case or [],
         "cached_at": time.strftime("%Y-%m-%d %H:%M:%S"),
     }
-    with open(path, "w") as f:
-        json.dump(data, f, indent=2)
+    with _locked():
+        _atomic_write_json(path, data)
+        if fingerprint:
+            _remove_stale(corpus_name, judge_model, method, keep=path)
     print(f"  💾 Cached {method} results → {os.path.basename(path)}")
     return path
 
 
+def _remove_stale(corpus_name: str, judge_model: str, method: str, keep: str) -> int:
+    """Delete this run's cache files saved under other fingerprints."""
+    prefix = _cache_key(corpus_name, judge_model, method) + "."
+    removed = 0
+    for fname in os.listdir(CACHE_DIR):
+        path = os.path.join(CACHE_DIR, fname)
+        if fname.startswith(prefix) and fname.endswith(".json") and path != keep:
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(path)
+                removed += 1
+    return removed
+
+
 def load_eval_results(
-    corpus_name: str, judge_model: str, method: str
+    corpus_name: str, judge_model: str, method: str, fingerprint: str | None = None
 ) -> dict | None:
     """
     Load cached evaluation results if available.
 
+    Args:
+        fingerprint: if given, only results saved with this exact fingerprint
+            are returned; a changed corpus, question set or config is a miss.
+
     Returns:
         dict with keys: avg_scores, per_case, cached_at — or None if no cache.
     """
-    path = _cache_path(corpus_name, judge_model, method)
+    path = _cache_path(corpus_name, judge_model, method, fingerprint)
     if not os.path.exists(path):
         return None
-    with open(path) as f:
-        data = json.load(f)
+    try:
+        with open(path) as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return None  # replaced under a new fingerprint or cleared meanwhile
+    except json.JSONDecodeError:
+        # Only files written before saves became atomic can be truncated
+        print(f"  ⚠️  Ignoring unreadable cache file {os.path.basename(path)}")
+        return None
     print(f"  ⚡ Loaded cached {method} results (from {data.get('cached_at', 'unknown')})")
     return data
 
@@ -106,11 +224,13 @@ def clear_eval_cache(
         judge_model: If provided, only clear cache for this judge.
 
     Returns:
-        Number of cache files deleted.
+        Number of cache entries deleted (run files + per-case scores).
     """
     if not os.path.exists(CACHE_DIR):
         return 0
 
+    cleared_cases = _clear_case_scores(corpus_name, judge_model)
+
     deleted = 0
     prefix_parts = []
     if corpus_name:
@@ -120,23 +240,269 @@ def clear_eval_cache(
             prefix_parts.append("")  # wildcard first segment
         prefix_parts.append(_sanitize(judge_model))
 
-    for fname in os.listdir(CACHE_DIR):
-        if not fname.endswith(".json"):
-            continue
-        if prefix_parts:
-            # Check if filename matches the filter
-            parts = fname.replace(".json", "").split("__")
-            match = True
-            if corpus_name and (len(parts) < 1 or parts[0] != _sanitize(corpus_name)):
-                match = False
-            if judge_model and (len(parts) < 2 or parts[1] != _sanitize(judge_model)):
-                match = False
-            if not match:
+    with _locked():
+        for fname in os.listdir(CACHE_DIR):
+            if not fname.endswith(".json"):
                 continue
-        os.remove(os.path.join(CACHE_DIR, fname))
-        deleted += 1
+            if prefix_parts:
+                # Check if filename matches the filter
+                parts = fname.replace(".json", "").split("__")
+                match = True
+                if corpus_name and (len(parts) < 1 or parts[0] != _sanitize(corpus_name)):
+                    match = False
+                if judge_model and (len(parts) < 2 or parts[1] != _sanitize(judge_model)):
+                    match = False
+                if not match:
+                    continue
+            os.remove(os.path.join(CACHE_DIR, fname))
+            deleted += 1
 
     if deleted:
         print(f"  🗑️  Cleared {deleted} cached evaluation file(s)")
+    if cleared_cases:
+        print(f"  🗑️  Cleared {cleared_cases} cached test-case score(s)")
+    return deleted + cleared_cases
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# Per-test-case cache (SQLite)
+# ═══════════════════════════════════════════════════════════════════════════
+
+def _hash(*parts) -> str:
+    """Stable SHA-256 of JSON-serializable parts."""
+    payload = json.dumps(parts, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def case_key(
+    question: str,
+    retrieval_context: list[str],
+    actual_output: str,
+    metric: str,
+    judge_model: str,
+) -> str:
+    """Cache key for one metric score of one test case."""
+    return _hash(question, retrieval_context, actual_output, metric, judge_model)
+
+
+def generation_key(question: str, context: str, model: str) -> str:
+    """Cache key for one generated answer."""
+    return _hash(question, context, model)
+
+
+def _connect_cases() -> sqlite3.Connection:
+    """Open (and create if needed) the per-case SQLite cache."""
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    # SQLite locks the file itself, so concurrent notebook runs and worker
+    # threads can share it; timeout waits for a busy writer.
+    conn = sqlite3.connect(CASE_DB_PATH, timeout=30)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS case_scores (
+            key          TEXT PRIMARY KEY,
+            corpus_name  TEXT,
+            judge_model  TEXT,
+            method       TEXT,
+            metric       TEXT,
+            score        REAL,
+            cached_at    TEXT
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS generations (
+            key        TEXT PRIMARY KEY,
+            model      TEXT,
+            output     TEXT,
+            cached_at  TEXT
+        )
+    """)
+    return conn
+
+
+def _select_by_keys(table: str, column: str, keys: list[str]) -> dict:
+    if not keys or not os.path.exists(CASE_DB_PATH):
+        return {}
+    conn = _connect_cases()
+    try:
+        found = {}
+        unique = list(dict.fromkeys(keys))
+        for i in range(0, len(unique), 500):  # stay below SQLite's variable limit
+            batch = unique[i:i + 500]
+            marks = ", ".join("?" * len(batch))
+            found.update(conn.execute(
+                f"SELECT key, {column} FROM {table} WHERE key IN ({marks})", batch
+            ).fetchall())
+        return found
+    finally:
+        conn.close()
+
+
+def load_case_scores(keys: list[str]) -> dict[str, float]:
+    """Return {key: score} for every key already in the per-case cache."""
+    return _select_by_keys("case_scores", "score", keys)
+
+
+def save_case_scores(
+    corpus_name: str, judge_model: str, method: str, scores: dict[str, tuple[str, float]]
+) -> int:
+    """
+    Store per-case metric scores.
+
+    Args:
+        scores: {case_key: (metric_name, score)}
+
+    Returns:
+        Number of scores written.
+    """
+    if not scores:
+        return 0
+    now = time.strftime("%Y-%m-%d %H:%M:%S")
+    conn = _connect_cases()
+    try:
+        with conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO case_scores VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(key, corpus_name, judge_model, method, metric, score, now)
+                 for key, (metric, score) in scores.items()],
+            )
+    finally:
+        conn.close()
+    return len(scores)
+
+
+def load_generations(keys: list[str]) -> dict[str, str]:
+    """Return {key: generated answer} for every key already cached."""
+    return _select_by_keys("generations", "output", keys)
+
+
+def save_generations(model: str, outputs: dict[str, str]) -> int:
+    """Store generated answers ({generation_key: output}); returns the count."""
+    if not outputs:
+        return 0
+    now = time.strftime("%Y-%m-%d %H:%M:%S")
+    conn = _connect_cases()
+    try:
+        with conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO generations VALUES (?, ?, ?, ?)",
+                [(key, model, output, now) for key, output in outputs.items()],
+            )
+    finally:
+        conn.close()
+    return len(outputs)
+
+
+def _clear_case_scores(corpus_name: str | None, judge_model: str | None) -> int:
+    """Delete matching per-case scores (and all generations on a full clear)."""
+    if not os.path.exists(CASE_DB_PATH):
+        return 0
+    where, params = [], []
+    if corpus_name:
+        where.append("corpus_name = ?")
+        params.append(corpus_name)
+    if judge_model:
+        where.append("judge_model = ?")
+        params.append(judge_model)
+    conn = _connect_cases()
+    try:
+        with conn:
+            sql = "DELETE FROM case_scores"
+            if where:
+                sql += " WHERE " + " AND ".join(where)
+            deleted = conn.execute(sql, params).rowcount
+            if not where:
+                conn.execute("DELETE FROM generations")
+    finally:
+        conn.close()
     return deleted
 
+
+# ═══════════════════════════════════════════════════════════════════════════
+# Concurrent-writer stress test
+# ═══════════════════════════════════════════════════════════════════════════
+
+def _stress_writer(cache_dir: str, writer: int, rounds: int, n_cases: int) -> None:
+    """Save `rounds` results for one run, alternating between two fingerprints."""
+    global CACHE_DIR
+    CACHE_DIR = cache_dir
+    per_case = [{"input": f"q{i}", "actual_output": "x" * 2000, "writer": writer}
+                for i in range(n_cases)]
+    with contextlib.redirect_stdout(None):
+        for r in range(rounds):
+            save_eval_results("stress", "judge", "Keyword Search",
+                              {"writer": writer, "round": r}, per_case,
+                              fingerprint=f"fp{r % 2}")
+
+
+def _check_file(path: str) -> str:
+    """"ok", "gone" (removed meanwhile), "torn" (bad JSON) or "mixed" (two writers)."""
+    try:
+        with open(path) as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return "gone"
+    except json.JSONDecodeError:
+        return "torn"
+    writer = data["avg_scores"]["writer"]
+    return "ok" if all(c["writer"] == writer for c in data["per_case"]) else "mixed"
+
+
+def _stress_reader(cache_dir: str, stop, counts) -> None:
+    """Read every cache file over and over until `stop` is set."""
+    while not stop.is_set():
+        for fname in os.listdir(cache_dir):
+            if fname.endswith(".json"):
+                result = _check_file(os.path.join(cache_dir, fname))
+                counts[result] = counts.get(result, 0) + 1
+
+
+def _stress(writers: int, rounds: int, n_cases: int) -> int:
+    """Run `writers` writer processes plus one reader against a temp cache dir."""
+    import multiprocessing as mp
+
+    with tempfile.TemporaryDirectory() as cache_dir, mp.Manager() as manager:
+        stop, counts = manager.Event(), manager.dict()
+        reader = mp.Process(target=_stress_reader, args=(cache_dir, stop, counts))
+        reader.start()
+        start = time.perf_counter()
+        procs = [mp.Process(target=_stress_writer, args=(cache_dir, w, rounds, n_cases))
+                 for w in range(writers)]
+        for p in procs:
+            p.start()
+        for p in procs:
+            p.join()
+        elapsed = time.perf_counter() - start
+        stop.set()
+        reader.join()
+
+        files = sorted(f for f in os.listdir(cache_dir) if f.endswith(".json"))
+        final = [_check_file(os.path.join(cache_dir, f)) for f in files]
+        leftovers = [f for f in os.listdir(cache_dir) if f.endswith(".tmp")]
+        counts = dict(counts)
+
+    failed_writers = sum(p.exitcode != 0 for p in procs)
+    print(f"✍️  {writers} writers x {rounds} saves in {elapsed:.2f}s "
+          f"({writers * rounds / elapsed:.0f} saves/s)")
+    print(f"👀 reader: {counts.get('ok', 0)} ok, {counts.get('gone', 0)} gone, "
+          f"{counts.get('torn', 0)} torn, {counts.get('mixed', 0)} mixed")
+    print(f"📁 final: {files} → {final}, {len(leftovers)} temp file(s) left")
+    ok = (not failed_writers and not counts.get("torn") and not counts.get("mixed")
+          and len(files) == 1 and final == ["ok"] and not leftovers)
+    print("✅ No torn or mixed cache files" if ok else "❌ Cache corruption detected")
+    return 0 if ok else 1
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Evaluation cache tools")
+    commands = parser.add_subparsers(dest="command", required=True)
+    stress = commands.add_parser(
+        "stress", help="Hammer a temp cache dir with concurrent writers.")
+    stress.add_argument("--writers", type=int, default=8)
+    stress.add_argument("--rounds", type=int, default=50)
+    stress.add_argument("--cases", type=int, default=50,
+                        help="Per-case entries per saved result (file size).")
+    args = parser.parse_args()
+    return _stress(args.writers, args.rounds, args.cases)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,239 @@
+"""
+Evaluation Runner - Run the RAG eval pipeline concurrently instead of one case at a time.
+
+Three stages, each timed (wall-clock):
+  1. retrieval   - search_fn for every test question, on a bounded thread pool
+  2. generation  - generate_fn for every (question, context), same pool size
+  3. judging     - DeepEval metrics in async mode, at most `max_concurrent`
+                   judge calls in flight
+
+Retrieval and generation are I/O-bound (Ollama HTTP calls), so threads are
+enough; search functions that touch DuckDB must use their own cursor.
+
+With `generator` set, answers are cached per (question, context, generator)
+and every metric score per (question, retrieval_context, actual_output,
+metric, judge) in eval_cache's SQLite file - a re-run only generates and
+judges the cases that are new or changed.
+
+Usage:
+    from eval_runner import run_eval
+
+    result = run_eval(test_questions, search_keyword, generate_response,
+                      judge_model="ollama/granite4:350m",
+                      corpus_name="synthetic", method="Keyword Search",
+                      generator="granite4:350m")
+    result["avg_scores"]   # {"Contextual Precision": 0.71, ...}
+    result["per_case"]     # one dict per test question, incl. per-metric scores
+    result["timings"]      # {"retrieval": 1.2, "generation": 20.5, "judging": 41.0}
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from eval_cache import (
+    case_key,
+    generation_key,
+    load_case_scores,
+    load_generations,
+    save_case_scores,
+    save_generations,
+)
+
+# Worker threads for retrieval and generation (Ollama serves a few requests
+# in parallel; more threads just queue up on the server).
+EVAL_MAX_WORKERS = 4
+
+# Upper bound on concurrent DeepEval judge calls.
+EVAL_MAX_CONCURRENT = 8
+
+NO_CONTEXT = "No documents found."
+
+
+def _timed(timings: dict, stage: str, fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    timings[stage] = time.perf_counter() - start
+    return result
+
+
+def retrieve_all(
+    questions: list[str], search_fn, top_k: int = 3, max_workers: int = EVAL_MAX_WORKERS
+) -> list[list[str]]:
+    """Run search_fn for every question; returns the retrieved texts per question."""
+    def _one(question):
+        return [doc for _, doc, _ in search_fn(question, top_k=top_k)]
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        return list(pool.map(_one, questions))
+
+
+def generate_all(
+    questions: list[str], contexts: list[list[str]], generate_fn,
+    max_workers: int = EVAL_MAX_WORKERS, generator: str | None = None,
+) -> list[str]:
+    """
+    Run generate_fn(question, context_str) for every question, in order.
+
+    If `generator` names the model behind generate_fn, cached answers are
+    reused and only the missing ones are generated (and then cached).
+    """
+    context_strs = [
+        "\n\n".join(retrieved) if retrieved else NO_CONTEXT for retrieved in contexts
+    ]
+    keys = ([generation_key(q, c, generator) for q, c in zip(questions, context_strs)]
+            if generator else [None] * len(questions))
+    cached = load_generations([k for k in keys if k]) if generator else {}
+    todo = [i for i, k in enumerate(keys) if k not in cached]
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        fresh = list(pool.map(lambda i: generate_fn(questions[i], context_strs[i]), todo))
+    if generator:
+        save_generations(generator, {keys[i]: out for i, out in zip(todo, fresh)})
+        if len(todo) < len(keys):
+            print(f"  🗃️  {len(keys) - len(todo)}/{len(keys)} answers from cache")
+
+    outputs = [cached.get(k) for k in keys]
+    for i, out in zip(todo, fresh):
+        outputs[i] = out
+    return outputs
+
+
+def build_metrics(judge_model: str, threshold: float = 0.5) -> list:
+    """The Day 1 metrics, in async mode so DeepEval can run them concurrently."""
+    from deepeval.metrics import AnswerRelevancyMetric, ContextualPrecisionMetric
+
+    return [
+        ContextualPrecisionMetric(model=judge_model, threshold=threshold, async_mode=True),
+        AnswerRelevancyMetric(model=judge_model, threshold=threshold, async_mode=True),
+    ]
+
+
+def judge_all(
+    test_cases: list, metrics: list, max_concurrent: int = EVAL_MAX_CONCURRENT
+) -> list[dict]:
+    """
+    Score test cases with DeepEval; returns {metric_name: score} per test case.
+
+    Test cases must have unique `name`s - async results can come back in any
+    order, so they are matched by name rather than position.  Metrics that
+    errored or timed out (no score) are left out instead of counted as 0.
+    """
+    from deepeval.evaluate import AsyncConfig, DisplayConfig, evaluate
+
+    eval_results = evaluate(
+        test_cases=test_cases,
+        metrics=metrics,
+        async_config=AsyncConfig(run_async=True, max_concurrent=max_concurrent),
+        display_config=DisplayConfig(show_indicator=False, print_results=False),
+    )
+    by_name = {
+        tr.name: {md.name: md.score for md in tr.metrics_data or []
+                  if md.score is not None and not md.error}
+        for tr in eval_results.test_results
+    }
+    return [by_name.get(tc.name, {}) for tc in test_cases]
+
+
+def judge_cached(
+    test_cases: list, metrics: list, judge_model: str,
+    corpus_name: str, method: str, max_concurrent: int = EVAL_MAX_CONCURRENT,
+) -> list[dict]:
+    """
+    judge_all() with the per-case cache: only cases missing a cached score for
+    some metric are sent to the judge; everything else comes from the cache.
+    Only real scores are saved, so a metric that failed is judged again on
+    the next run.
+    """
+    names = [m.__name__ for m in metrics]
+    keys = [
+        {name: case_key(tc.input, tc.retrieval_context, tc.actual_output, name, judge_model)
+         for name in names}
+        for tc in test_cases
+    ]
+    cached = load_case_scores([k for case in keys for k in case.values()])
+    todo = [i for i, case in enumerate(keys) if any(k not in cached for k in case.values())]
+
+    fresh = judge_all([test_cases[i] for i in todo], metrics, max_concurrent) if todo else []
+    save_case_scores(corpus_name, judge_model, method, {
+        keys[i][name]: (name, score)
+        for i, scores in zip(todo, fresh)
+        for name, score in scores.items()
+        if name in keys[i] and score is not None
+    })
+    if len(todo) < len(test_cases):
+        print(f"  🗃️  {len(test_cases) - len(todo)}/{len(test_cases)} cases scored from cache")
+
+    results = [{name: cached[k] for name, k in case.items() if k in cached} for case in keys]
+    for i, scores in zip(todo, fresh):
+        results[i] = scores
+    return results
+
+
+def average_scores(case_scores: list[dict]) -> dict:
+    """metric_name -> mean score over all cases that have that metric."""
+    scores: dict[str, list[float]] = {}
+    for case in case_scores:
+        for name, score in case.items():
+            scores.setdefault(name, []).append(score)
+    return {n: sum(v) / len(v) for n, v in scores.items()}
+
+
+def run_eval(
+    test_questions: list[dict],
+    search_fn,
+    generate_fn,
+    judge_model: str,
+    top_k: int = 3,
+    max_workers: int = EVAL_MAX_WORKERS,
+    max_concurrent: int = EVAL_MAX_CONCURRENT,
+    corpus_name: str | None = None,
+    method: str | None = None,
+    generator: str | None = None,
+) -> dict:
+    """
+    Retrieve, generate and judge every test question; print per-stage timings.
+
+    Per-case caching is on when `generator` is given (answers) and when both
+    `corpus_name` and `method` are given (judge scores).
+
+    Returns:
+        dict with keys: avg_scores, per_case, timings
+    """
+    from deepeval.test_case import LLMTestCase
+
+    timings: dict[str, float] = {}
+    questions = [t["question"] for t in test_questions]
+
+    contexts = _timed(timings, "retrieval", retrieve_all,
+                      questions, search_fn, top_k, max_workers)
+    outputs = _timed(timings, "generation", generate_all,
+                     questions, contexts, generate_fn, max_workers, generator)
+
+    test_cases = [
+        LLMTestCase(
+            name=f"case-{i}",
+            input=test["question"],
+            actual_output=output,
+            expected_output=test["expected"],
+            retrieval_context=retrieved,
+        )
+        for i, (test, retrieved, output) in enumerate(zip(test_questions, contexts, outputs))
+    ]
+    metrics = build_metrics(judge_model)
+    if corpus_name and method:
+        case_scores = _timed(timings, "judging", judge_cached, test_cases, metrics,
+                             judge_model, corpus_name, method, max_concurrent)
+    else:
+        case_scores = _timed(timings, "judging", judge_all,
+                             test_cases, metrics, max_concurrent)
+
+    per_case = [
+        {"input": tc.input, "actual_output": tc.actual_output,
+         "expected_output": tc.expected_output, "retrieval_context": tc.retrieval_context,
+         "scores": scores}
+        for tc, scores in zip(test_cases, case_scores)
+    ]
+    print("  ⏱️  " + " | ".join(f"{stage} {secs:.1f}s" for stage, secs in timings.items())
+          + f" | total {sum(timings.values()):.1f}s ({len(test_cases)} cases)")
+    return {"avg_scores": average_scores(case_scores), "per_case": per_case,
+            "timings": timings}
@@ -71,6 +71,7 @@ def _(mo):
 def _():
     import sys, os
     sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from eval_cache import eval_fingerprint as _eval_fingerprint
 
     # ── Corpus configuration ─────────────────────────────────────────
     # Switch between "synthetic" and "s17" to change the entire notebook
@@ -96,7 +97,12 @@ def _():
     | `How do automobiles work?` | ❌ Registration doc | ⚠️ Better | ✅ Correct | Vector understands automobiles = cars |
     | `How to fix code errors?` | ❌ Misses | ❌ Misses | ✅ Correct | Vector understands fix errors = debugging |
     """
+
+    # Content hash of the documents: cached eval results are only reused
+    # while the corpus they were computed on is unchanged.
+    CORPUS_FINGERPRINT = _eval_fingerprint(documents)
     return (
+        CORPUS_FINGERPRINT,
         CORPUS_NAME,
         DEFAULT_QUERY,
         EXAMPLE_QUERIES,
@@ -105,6 +111,16 @@ def _():
     )
 
 
+@app.cell
+def _(CORPUS_FINGERPRINT):
+    from retrieval_cache import RetrievalCache
+
+    # Shared by every search function below: each (method, query, top_k) is
+    # searched once per session, however many cells and eval runs ask for it.
+    retrieval_cache = RetrievalCache(CORPUS_FINGERPRINT)
+    return (retrieval_cache,)
+
+
 @app.cell(hide_code=True)
 def _(mo):
     mo.md("""
@@ -122,10 +138,18 @@ def _(mo):
 
 
 @app.cell
-def _(documents):
+def _(documents, retrieval_cache):
     import re
+    from collections import defaultdict
     _strip = re.compile(r'[^a-z0-9]')
 
+    # Inverted index: word -> list of doc_ids containing it (built once).
+    # Each doc_id appears at most once per word, mirroring the per-doc word set.
+    _postings = defaultdict(list)
+    for _doc_id, _doc in enumerate(documents):
+        for _word in {_strip.sub('', w) for w in _doc.lower().split()}:
+            _postings[_word].append(_doc_id)
+
     def search_keyword(query: str, top_k: int = 3) -> list[tuple[int, str, int]]:
         """
         Simple keyword search: count matching words.
@@ -134,17 +158,17 @@ def _(documents):
         """
         query_words = [_strip.sub('', w) for w in query.lower().split() if _strip.sub('', w)]
 
-        scored_docs = []
-        for doc_id, doc in enumerate(documents):
-            doc_words = {_strip.sub('', w) for w in doc.lower().split()}
-            # Count how many query words appear in the document
-            score = sum(1 for word in query_words if word in doc_words)
-            if score > 0:
-                scored_docs.append((doc_id, doc, score))
-
-        # Sort by score descending
-        scored_docs.sort(key=lambda x: x[2], reverse=True)
-        return scored_docs[:top_k]
+        # Only visit documents that contain at least one query word
+        scores = defaultdict(int)
+        for word in query_words:
+            for doc_id in _postings.get(word, ()):
+                scores[doc_id] += 1
+
+        # Sort by score descending (ties keep corpus order, as before)
+        ranked = sorted(scores.items(), key=lambda x: (-x[1], x[0]))[:top_k]
+        return [(doc_id, documents[doc_id], score) for doc_id, score in ranked]
+
+    search_keyword = retrieval_cache.wrap("keyword", search_keyword)
     return (search_keyword,)
 
 
@@ -283,9 +307,12 @@ def _():
 
 @app.cell
 def _(DEFAULT_QUERY, context, mo, ollama, query_form):
-    def generate_response(query: str, ctx: str) -> str:
-        """Generate a response using Ollama's granite4:350m model."""
-        prompt = f"""Based on the following context, answer the question.
+    import time
+
+    GENERATOR_MODEL = "granite4:350m"
+
+    def _build_prompt(query: str, ctx: str) -> str:
+        return f"""Based on the following context, answer the question.
 
     Context:
     {ctx}
@@ -294,22 +321,47 @@ def _(DEFAULT_QUERY, context, mo, ollama, query_form):
 
     Answer:"""
 
+    def generate_response(query: str, ctx: str) -> str:
+        """Generate a response using Ollama's granite4:350m model."""
         response = ollama.chat(
-            model="granite4:350m",
-            messages=[{"role": "user", "content": prompt}]
+            model=GENERATOR_MODEL,
+            messages=[{"role": "user", "content": _build_prompt(query, ctx)}]
         )
         return response["message"]["content"]
 
-    # Get query from the submitted form
-    _query = query_form.value["query"] if query_form.value else DEFAULT_QUERY
-
-    # Generate response for current query
-    if _query and context != "No relevant documents found.":
-        llm_response = generate_response(_query, context)
-    else:
-        llm_response = "No context available to generate response."
+    def stream_response(query: str, ctx: str, stats: dict | None = None):
+        """
+        Same as generate_response, but yields tokens as they arrive.
 
-    mo.md(f"""
+        If `stats` is given it receives time-to-first-token (ttft, seconds),
+        tokens and tokens_per_sec once generation finishes.
+        """
+        t0 = time.perf_counter()
+        ttft, pieces, final = None, 0, {}
+        for part in ollama.chat(
+            model=GENERATOR_MODEL,
+            messages=[{"role": "user", "content": _build_prompt(query, ctx)}],
+            stream=True,
+        ):
+            token = part["message"]["content"]
+            if token:
+                if ttft is None:
+                    ttft = time.perf_counter() - t0
+                pieces += 1
+                yield token
+            if part.get("done"):
+                final = part
+        if stats is not None:
+            elapsed = time.perf_counter() - t0
+            ttft = ttft if ttft is not None else elapsed
+            # Ollama's own counters when present, else the streamed pieces
+            tokens = final.get("eval_count") or pieces
+            gen_secs = (final.get("eval_duration") or 0) / 1e9 or (elapsed - ttft)
+            stats.update(ttft=ttft, tokens=tokens,
+                         tokens_per_sec=tokens / gen_secs if gen_secs > 0 else 0.0)
+
+    def _response_md(text: str, footer: str = "") -> object:
+        return mo.md(f"""
     ## Step 4: Generate Response (The "G" in RAG)
 
     Using **granite4:350m** via Ollama to generate an answer:
@@ -318,9 +370,29 @@ def _(DEFAULT_QUERY, context, mo, ollama, query_form):
 
     **Response:**
 
-    {llm_response}
+    {text}
+
+    {footer}
     """)
-    return (generate_response,)
+
+    # Get query from the submitted form
+    _query = query_form.value["query"] if query_form.value else DEFAULT_QUERY
+
+    # Stream the response for the current query, updating the cell as tokens arrive
+    _stats = {}
+    _footer = ""
+    if _query and context != "No relevant documents found.":
+        llm_response = ""
+        for _token in stream_response(_query, context, _stats):
+            llm_response += _token
+            mo.output.replace(_response_md(llm_response + " ▌"))
+        _footer = (f"*⏱️ Time to first token: {_stats['ttft']:.2f}s · "
+                   f"{_stats['tokens']} tokens @ {_stats['tokens_per_sec']:.1f} tok/s*")
+    else:
+        llm_response = "No context available to generate response."
+
+    _response_md(llm_response, _footer)
+    return GENERATOR_MODEL, generate_response
 
 
 @app.cell(hide_code=True)
@@ -374,55 +446,47 @@ def _(mo):
 
 
 @app.cell
-def _(CORPUS_NAME, generate_response, test_questions):
-    from eval_cache import load_eval_results, save_eval_results
+def _(
+    CORPUS_FINGERPRINT,
+    CORPUS_NAME,
+    GENERATOR_MODEL,
+    generate_response,
+    test_questions,
+):
+    from eval_cache import eval_fingerprint, load_eval_results, save_eval_results
+    from eval_runner import run_eval
 
     JUDGE_MODEL = "modal/qwen3-vl-8b"
+    EVAL_TOP_K = 3
 
-    def load_or_run_eval(search_fn, label):
-        """Load cached eval results, or run DeepEval if no cache."""
-        cached = load_eval_results(CORPUS_NAME, JUDGE_MODEL, label)
+    # Everything but the retrieval method's own config, hashed once
+    _inputs_fp = eval_fingerprint(CORPUS_FINGERPRINT, test_questions,
+                                  GENERATOR_MODEL, EVAL_TOP_K)
+
+    def load_or_run_eval(search_fn, label, **retrieval_config):
+        """
+        Load cached eval results, or run DeepEval if no cache.
+
+        retrieval_config (model names, BM25 parameters, ...) is part of the
+        cache fingerprint, together with the corpus, the test questions,
+        top_k and the generator model — change any of them and the cached
+        result is not reused.
+        """
+        _fp = eval_fingerprint(_inputs_fp, label, retrieval_config)
+        cached = load_eval_results(CORPUS_NAME, JUDGE_MODEL, label, _fp)
         if cached:
             return cached["avg_scores"]
 
-        # No cache — run DeepEval live
-        from deepeval.metrics import AnswerRelevancyMetric, ContextualPrecisionMetric
-        from deepeval.test_case import LLMTestCase
-        from deepeval import evaluate
-
-        test_cases = []
-        for test in test_questions:
-            results = search_fn(test["question"], top_k=3)
-            retrieved_contexts = [doc for _, doc, _ in results]
-            context_str = "\n\n".join(retrieved_contexts) if retrieved_contexts else "No documents found."
-            actual_output = generate_response(test["question"], context_str)
-            test_cases.append(LLMTestCase(
-                input=test["question"],
-                actual_output=actual_output,
-                expected_output=test["expected"],
-                retrieval_context=retrieved_contexts,
-            ))
-
-        metrics = [
-            ContextualPrecisionMetric(model="ollama/granite4:350m", threshold=0.5, async_mode=False),
-            AnswerRelevancyMetric(model="ollama/granite4:350m", threshold=0.5, async_mode=False),
-        ]
-        eval_results = evaluate(test_cases, metrics)
-
-        # Extract avg scores and save to cache
-        scores = {}
-        for tr in eval_results.test_results:
-            for md in tr.metrics_data:
-                scores.setdefault(md.name, []).append(md.score or 0)
-        avg_scores = {n: sum(v)/len(v) for n, v in scores.items()}
-
-        per_case = [
-            {"input": tc.input, "actual_output": tc.actual_output,
-             "expected_output": tc.expected_output, "retrieval_context": tc.retrieval_context}
-            for tc in test_cases
-        ]
-        save_eval_results(CORPUS_NAME, JUDGE_MODEL, label, avg_scores, per_case)
-        return avg_scores
+        # No cache — run DeepEval: retrieval and generation on a small
+        # thread pool, judge calls async with a concurrency cap. Cases
+        # already scored come from the per-case cache.
+        result = run_eval(test_questions, search_fn, generate_response,
+                          judge_model="ollama/granite4:350m", top_k=EVAL_TOP_K,
+                          corpus_name=CORPUS_NAME, method=label,
+                          generator=GENERATOR_MODEL)
+        save_eval_results(CORPUS_NAME, JUDGE_MODEL, label,
+                          result["avg_scores"], result["per_case"], fingerprint=_fp)
+        return result["avg_scores"]
     return (load_or_run_eval,)
 
 
@@ -490,13 +554,26 @@ def _(mo):
 
 
 @app.cell
-def _(documents):
+def _(documents, retrieval_cache):
+    import heapq
     from rank_bm25 import BM25Okapi
 
     # Tokenize documents for BM25
     tokenized_docs = [doc.lower().split() for doc in documents]
     bm25_index = BM25Okapi(tokenized_docs)
 
+    # Precompute each term's contribution per document, once:
+    #   idf(term) * tf * (k1 + 1) / (tf + k1 * (1 - b + b * doc_len / avgdl))
+    # using rank_bm25's own IDF and length statistics, so scores are identical
+    # to bm25_index.get_scores() — but a query only touches its own terms.
+    _k1, _b, _avgdl = bm25_index.k1, bm25_index.b, bm25_index.avgdl
+    _term_weights = {}
+    for _doc_id, (_freqs, _dl) in enumerate(zip(bm25_index.doc_freqs, bm25_index.doc_len)):
+        _norm = _k1 * (1 - _b + _b * _dl / _avgdl)
+        for _term, _tf in _freqs.items():
+            _weight = bm25_index.idf[_term] * (_tf * (_k1 + 1) / (_tf + _norm))
+            _term_weights.setdefault(_term, []).append((_doc_id, _weight))
+
     def search_bm25(query: str, top_k: int = 3) -> list[tuple[int, str, float]]:
         """
         BM25 search using rank_bm25 library.
@@ -504,16 +581,22 @@ def _(documents):
         Returns: List of (doc_id, doc_text, score) tuples
         """
         tokenized_query = query.lower().split()
-        scores = bm25_index.get_scores(tokenized_query)
 
-        # Get top_k documents
-        scored_docs = [(i, documents[i], scores[i]) for i in range(len(documents))]
-        scored_docs.sort(key=lambda x: x[2], reverse=True)
+        # Sparse scoring: only documents containing a query term get a score
+        scores = {}
+        for term in tokenized_query:
+            for doc_id, weight in _term_weights.get(term, ()):
+                scores[doc_id] = scores.get(doc_id, 0.0) + weight
+
+        # Heap-select top_k by score (ties keep corpus order), dropping zero scores
+        top = heapq.nsmallest(
+            top_k,
+            ((-score, doc_id) for doc_id, score in scores.items() if score > 0),
+        )
+        return [(doc_id, documents[doc_id], -neg) for neg, doc_id in top]
 
-        # Filter out zero scores
-        scored_docs = [(i, doc, score) for i, doc, score in scored_docs if score > 0]
-        return scored_docs[:top_k]
-    return (search_bm25,)
+    search_bm25 = retrieval_cache.wrap(f"bm25/k1={bm25_index.k1}/b={bm25_index.b}", search_bm25)
+    return bm25_index, search_bm25
 
 
 @app.cell
@@ -604,8 +687,9 @@ def _(mo):
 
 
 @app.cell
-def _(load_or_run_eval, search_bm25):
-    eval_scores_bm25 = load_or_run_eval(search_bm25, "BM25 Search")
+def _(bm25_index, load_or_run_eval, search_bm25):
+    eval_scores_bm25 = load_or_run_eval(search_bm25, "BM25 Search",
+                                        k1=bm25_index.k1, b=bm25_index.b)
     return (eval_scores_bm25,)
 
 
@@ -722,11 +806,18 @@ def _(mo):
 @app.cell
 def _(documents, ollama):
     import duckdb
+    from embed_cache import EmbeddingCache
+
+    EMBED_MODEL = "qwen3-embedding:0.6b"
 
     # Embed all documents using Ollama
-    _embed_response = ollama.embed(model="qwen3-embedding:0.6b", input=documents)
+    _embed_response = ollama.embed(model=EMBED_MODEL, input=documents)
     doc_embeddings = _embed_response["embeddings"]
-    return doc_embeddings, duckdb
+
+    # Query embeddings go through the same cache as Part 3: a query that was
+    # embedded once (query box, comparisons, evals) is not sent to Ollama again.
+    query_embed_cache = EmbeddingCache(EMBED_MODEL)
+    return EMBED_MODEL, doc_embeddings, duckdb, query_embed_cache
 
 
 @app.cell
@@ -771,27 +862,39 @@ def _(doc_embeddings, documents, duckdb):
 
 
 @app.cell
-def _(conn, ollama):
+def _(EMBED_MODEL, conn, query_embed_cache, retrieval_cache):
     def search_vector(query: str, top_k: int = 3) -> list[tuple[int, str, float]]:
         """
         Vector search using DuckDB VSS.
 
         Returns: List of (doc_id, doc_text, score) tuples
         """
-        # Embed the query using Ollama
-        _embed_response = ollama.embed(model="qwen3-embedding:0.6b", input=query)
-        query_embedding = _embed_response["embeddings"][0]
-
-        # Search using cosine similarity
-        results = conn.execute(f"""
-            SELECT id, text,
-                   array_cosine_similarity(embedding, ?::FLOAT[1024]) as score
-            FROM documents
-            ORDER BY score DESC
-            LIMIT ?
-        """, [query_embedding, top_k]).fetchall()
+        # Embed the query using Ollama (via the shared embedding cache)
+        query_embedding = query_embed_cache.embed([query])[0]
+
+        # Search by cosine distance (ascending) so the HNSW index is used:
+        # it only serves ORDER BY array_cosine_distance(col, <constant>) LIMIT n,
+        # so the query vector and limit are written into the SQL as constants.
+        # Score is reported as similarity = 1 - distance.
+        _vec = "[" + ", ".join(repr(float(x)) for x in query_embedding) + "]::FLOAT[1024]"
+        # A cursor per call: the eval runner calls this from several threads
+        # and one DuckDB connection must not be shared across threads.
+        with conn.cursor() as _cur:
+            results = _cur.execute(f"""
+                SELECT id, text, 1 - distance as score
+                FROM (
+                    SELECT id, text,
+                           array_cosine_distance(embedding, {_vec}) as distance
+                    FROM documents
+                    ORDER BY distance
+                    LIMIT {int(top_k)}
+                )
+                ORDER BY distance
+            """).fetchall()
 
         return [(row[0], row[1], row[2]) for row in results]
+
+    search_vector = retrieval_cache.wrap(f"vector/{EMBED_MODEL}", search_vector)
     return (search_vector,)
 
 
@@ -890,8 +993,9 @@ def _(mo):
 
 
 @app.cell
-def _(load_or_run_eval, search_vector):
-    eval_scores_vector = load_or_run_eval(search_vector, "Vector Search")
+def _(EMBED_MODEL, load_or_run_eval, search_vector):
+    eval_scores_vector = load_or_run_eval(search_vector, "Vector Search",
+                                          embed_model=EMBED_MODEL)
     return (eval_scores_vector,)
 
 
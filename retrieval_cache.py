@@ -0,0 +1,98 @@
+"""
+Retrieval Cache - Memoize search results across notebook cells and eval runs.
+
+The notebook asks the same backends the same questions many times: the
+per-method query views, the side-by-side comparisons and every eval run.
+``RetrievalCache`` wraps each search function so a (method, corpus
+fingerprint, query, top_k) is searched once per session:
+
+  • LRU eviction once ``max_entries`` results are held;
+  • concurrent misses for the same key (eval runner threads) wait for the
+    one search in flight instead of repeating it;
+  • wrapping a method again - its cell was re-run with edited code - drops
+    that method's old results.
+
+Usage:
+    from retrieval_cache import RetrievalCache
+
+    retrieval_cache = RetrievalCache(CORPUS_FINGERPRINT)
+    search_keyword = retrieval_cache.wrap("keyword", search_keyword)
+    search_keyword("What is ML?", 3)   # searches
+    search_keyword("What is ML?", 3)   # served from the cache
+    retrieval_cache.stats()            # {"hits": 1, "misses": 1, "entries": 1}
+"""
+
+import functools
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+
+
+class RetrievalCache:
+    """Bounded LRU cache of search results shared by all search methods."""
+
+    def __init__(self, corpus_fingerprint: str, max_entries: int = 2048) -> None:
+        self.corpus_fingerprint = corpus_fingerprint
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        # (method, corpus_fingerprint, query, top_k) -> Future of the results
+        self._entries: OrderedDict[tuple, Future] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def wrap(self, method: str, search_fn):
+        """
+        Memoized search_fn(query, top_k) for `method`.
+
+        `method` must identify the backend and its configuration, e.g.
+        "vector/qwen3-embedding:0.6b"; results already cached for it are dropped.
+        """
+        self.invalidate(method)
+
+        @functools.wraps(search_fn)
+        def cached_search(query: str, top_k: int = 3) -> list[tuple]:
+            return self.search(method, search_fn, query, top_k)
+        return cached_search
+
+    def search(self, method: str, search_fn, query: str, top_k: int = 3) -> list[tuple]:
+        """search_fn(query, top_k=top_k), unless this key was searched before."""
+        key = (method, self.corpus_fingerprint, query, int(top_k))
+        with self._lock:
+            future = self._entries.get(key)
+            cached = future is not None
+            if cached:
+                self._entries.move_to_end(key)
+                self.hits += 1
+            else:
+                future = self._entries[key] = Future()
+                self.misses += 1
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        if cached:
+            # Waits if another thread is still searching this key
+            return list(future.result())
+
+        try:
+            results = search_fn(query, top_k=top_k)
+        except BaseException as exc:
+            with self._lock:
+                if self._entries.get(key) is future:
+                    del self._entries[key]  # don't cache failures
+            future.set_exception(exc)
+            raise
+        future.set_result(results)
+        return list(results)
+
+    def invalidate(self, method: str | None = None) -> int:
+        """Drop the cached results of one method (or of all); returns the count."""
+        with self._lock:
+            keys = [k for k in self._entries if method is None or k[0] == method]
+            for k in keys:
+                del self._entries[k]
+            return len(keys)
+
+    def stats(self) -> dict:
+        """Hit/miss counters and current number of cached results."""
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses,
+                    "entries": len(self._entries)}
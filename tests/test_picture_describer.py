@@ -0,0 +1,90 @@
+"""PictureDescriber against the local stand-in VLM server."""
+
+import struct
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "docling-exercise-example-answers"))
+
+from picture_describer import PictureDescriber, serve_stub  # noqa: E402
+
+PROMPT = "Describe the image."
+
+
+def _png(width: int, height: int) -> bytes:
+    """PNG signature + IHDR header – enough for the stand-in server."""
+    return b"\x89PNG\r\n\x1a\n" + struct.pack(">I4sII", 13, b"IHDR", width, height)
+
+
+def _describer(server, **kwargs) -> PictureDescriber:
+    url = f"http://127.0.0.1:{server.server_port}/v1/chat/completions"
+    return PictureDescriber(url, "stub-vlm", PROMPT, **kwargs)
+
+
+@pytest.fixture
+def slow_server():
+    server = serve_stub(delay=0.3)
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_describe_many_runs_concurrently(slow_server):
+    pngs = [_png(10 + i, 20) for i in range(8)]
+    describer = _describer(slow_server, max_in_flight=8)
+
+    start = time.perf_counter()
+    texts = describer.describe_many(pngs)
+    elapsed = time.perf_counter() - start
+    describer.close()
+
+    # One at a time would take 8 x 0.3 s.
+    assert elapsed < 1.2
+    assert [t.split()[1] for t in texts] == [f"{10 + i}x20" for i in range(8)]
+    assert describer.stats() == {"hits": 0, "misses": 8, "failures": 0, "entries": 8}
+
+
+def test_identical_pictures_are_sent_once(slow_server):
+    describer = _describer(slow_server)
+    texts = describer.describe_many([_png(5, 5), _png(5, 5), _png(6, 6)])
+    again = describer.describe_many([_png(5, 5)])
+    describer.close()
+
+    assert texts[0] == texts[1] == again[0]
+    assert describer.stats()["misses"] == 2
+    assert describer.stats()["hits"] == 2
+
+
+def test_per_file_cache_survives_a_new_describer(tmp_path):
+    pngs = [_png(30, 40), _png(50, 60)]
+    server = serve_stub()
+    try:
+        first = _describer(server, cache_dir=tmp_path)
+        texts = first.describe_many(pngs)
+        first.close()
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert sorted(p.name for p in tmp_path.iterdir()) == sorted(
+        f"{first.key(png)}.txt" for png in pngs)
+
+    # Server is gone: everything must come from the cache directory.
+    second = _describer(server, cache_dir=tmp_path, max_retries=0, timeout=1)
+    assert second.describe_many(pngs) == texts
+    assert second.stats()["hits"] == 2
+    second.close()
+
+
+def test_failure_returns_none():
+    server = serve_stub()
+    server.shutdown()
+    server.server_close()
+
+    describer = _describer(server, max_retries=0, timeout=1)
+    assert describer.describe_many([_png(1, 1)]) == [None]
+    assert describer.stats()["failures"] == 1
+    describer.close()
@@ -0,0 +1,108 @@
+"""RerankClient against the local stand-in /v1/rerank server."""
+
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "advanced_rag_example_answer"))
+
+from rerank_client import RerankClient, serve_stub  # noqa: E402
+
+QUERY = "how does attention work"
+DOCS = [
+    "the weather is nice today",
+    "attention lets each token look at every other token",
+    "how does attention work in a transformer",
+    "cooking pasta takes ten minutes",
+    "does the model work without attention",
+]
+
+
+@pytest.fixture
+def server():
+    server = serve_stub()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _client(server, **kwargs) -> RerankClient:
+    url = f"http://127.0.0.1:{server.server_port}/v1/rerank"
+    return RerankClient(url, "stub", **kwargs)
+
+
+def test_single_batch(server):
+    client = _client(server)
+    scored = client.rerank(QUERY, DOCS, top_k=2)
+    client.close()
+
+    assert [text for text, _ in scored] == [DOCS[2], DOCS[4]]
+    assert scored[0][1] == 1.0
+    assert server.requests == 1
+
+
+def test_multi_batch_merges_and_resorts(server):
+    client = _client(server, batch_size=2)
+    scored = client.rerank(QUERY, DOCS, top_k=3)
+    client.close()
+
+    # Same ranking as one big batch, although the best documents sit in
+    # different batches.
+    single = _client(server)
+    reference = single.rerank(QUERY, DOCS, top_k=3)
+    single.close()
+    assert scored == reference
+    assert [s for _, s in scored] == sorted((s for _, s in scored), reverse=True)
+    assert server.requests == 3 + 1  # ceil(5 / 2) batches + the reference call
+
+
+def test_arerank(server):
+    client = _client(server)
+    scored = asyncio.run(client.arerank(QUERY, DOCS, top_k=1))
+    client.close()
+
+    assert scored == [(DOCS[2], 1.0)]
+
+
+def test_arerank_respects_max_concurrency():
+    server = serve_stub(delay=0.1)
+    try:
+        client = _client(server, max_concurrency=2)
+
+        async def many():
+            return await asyncio.gather(
+                *(client.arerank(QUERY, DOCS, top_k=1) for _ in range(8)))
+
+        results = asyncio.run(many())
+        client.close()
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert results == [[(DOCS[2], 1.0)]] * 8
+    assert server.requests == 8
+    assert server.max_in_flight == 2
+
+
+def test_empty_documents(server):
+    client = _client(server)
+    assert client.rerank(QUERY, [], top_k=3) == []
+    client.close()
+
+    assert server.requests == 0
+
+
+def test_retries_after_5xx():
+    server = serve_stub(fail_first=2)
+    try:
+        client = _client(server, max_retries=3)
+        scored = client.rerank(QUERY, DOCS, top_k=1)
+        client.close()
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert scored == [(DOCS[2], 1.0)]
+    assert server.requests == 3  # two 503s, then success